@@ -0,0 +1,97 @@
+import io
+
+from errorslist import *
+from errorslist import __all__ as errorNames
+from instruction import Factory
+from interpret import Interpreter
+
+__all__ = ['loadProgram', 'LoadedProgram', 'Result', 'statNames', *errorNames]
+
+statNames = ('insts', 'hot', 'vars')                        # statistics that can be requested by LoadedProgram.run
+
+
+class Result:
+    '''
+    Result of one execution: return code (0 or code of EXIT), text written by the program (None if it was written
+    to a stream given to run) and requested statistics of shape <name> -> value
+    '''
+    __slots__ = ('exitCode', 'stdout', 'stats')
+
+    def __init__(self, exitCode, stdout, stats):
+        self.exitCode = exitCode
+        self.stdout = stdout
+        self.stats = stats
+
+    def __repr__(self):
+        return f'Result(exitCode={self.exitCode!r}, stdout={self.stdout!r}, stats={self.stats!r})'
+
+
+def loadProgram(source, engine='interpreted', optimize=False, peephole=True, inlineCaches=True):
+    '''
+    Loads program from source XML (path, bytes of XML or file object) for execution in this process with given
+    options (the same as of the command line: --engine, -O, --no-peephole, --no-inline-caches).
+    Invalid source raises subclass of InterpretError (InputError if the source can't be read)
+    '''
+    if engine not in ('interpreted', 'compiled'):
+        raise ParameterError()
+    if type(source) is bytes:
+        source = io.BytesIO(source)
+    return LoadedProgram(Factory().createProgram(source), engine, optimize, peephole, inlineCaches)
+
+
+class LoadedProgram:
+    '''
+    Program loaded once and executed any number of times in this process, code for the engine is prepared
+    by the first run and reused by the following ones. Statistics are kept by a singleton, so programs
+    of one process are executed one at a time (not from several threads at once)
+    '''
+    def __init__(self, program, engine='interpreted', optimize=False, peephole=True, inlineCaches=True):
+        self.program = program                              # Program class object (decoded instructions)
+        self.vm = Interpreter()                             # Interpreter class object executing the program
+        self.vm.program = program
+        self.vm.engine = engine
+        self.vm.optimize = optimize
+        self.vm.peephole = peephole
+        self.vm.inlineCaches = inlineCaches
+        self.options = None                                 # statistics options (collect, countVars) the code was prepared for
+
+    def run(self, input=None, output=None, stats=()):
+        '''
+        Executes the program. input is the text read by READ (or a text stream, no input if None), output
+        is a text stream the program writes to (the text is returned in Result if not given), stats are names
+        of requested statistics (see statNames). Returns Result, errors raise subclasses of InterpretError
+        (InternalError if the interpreter fails unexpectedly), their stdout attribute is the text written until
+        the error if the output is returned. DPRINT and BREAK write to sys.stderr
+        '''
+        stats = tuple(stats)
+        if any(name not in statNames for name in stats):
+            raise ParameterError()
+        vm, counters = self.vm, self.vm.stats
+        options = (bool(stats), 'vars' in stats)
+        if options != self.options:                         # counting code is generated only if statistics are collected
+            vm.prepared, self.options = None, options
+        counters.statsGroups, counters.jsonFile = {}, None
+        counters.collect, counters.countVars = options
+        captured = io.StringIO() if output is None else None
+        if type(input) is str:
+            input = io.StringIO(input)
+        vm.reset(io.StringIO() if input is None else input, output or captured)
+        try:
+            vm.executeProgram()
+            code = INTER_OK
+        except ProgramExit as programExit:
+            code = programExit.code
+        except InterpretError as error:
+            vm.output.flush()
+            error.stdout = None if captured is None else captured.getvalue()
+            raise
+        except Exception as failure:                        # any other failure is reported as InternalError as well
+            vm.output.flush()
+            error = InternalError()
+            error.stdout = None if captured is None else captured.getvalue()
+            raise error from failure
+        vm.output.flush()
+        if stats:
+            counters.update()
+        return Result(code, None if captured is None else captured.getvalue(),
+            {name : getattr(counters, name) for name in stats})
@@ -1,16 +1,28 @@
-import xml.etree.ElementTree as ET
-
 from errorslist import *
+from value import Value
+from sets import typeTags
+
+
+def decodeEscapes(text):
+    '''
+    Decodes \\ddd escape sequences of string constant
+    '''
+    if '\\' not in text:
+        return text
+    import re                                       # not imported at startup, programs restored from cache don't decode
+    return re.sub(r'\\([0-9]{3})', lambda x: chr(int(x[1])), text)
 
 
 class Argument:
     '''
-    Class representing both instruction argument and variables in any of memory frames
+    Class representing instruction argument (runtime values of variables are Value class objects)
     '''
-    type = None                                # xml type, will be changed to data type for variables
+    type = None                                # xml type
     suffix = None                              # text before @
-    value = None                               # text after @ if constant or value of variable if variable
+    value = None                               # text after @ if constant
     id = None                                  # text after @ if variable
+    key = None                                 # frame slot number (or name in dynamic frames) if variable, resolved by Program
+    constant = None                            # Value class object if constant
 
 class Label(Argument):
     '''
@@ -18,10 +30,10 @@ class Label(Argument):
     '''
     def __init__(self, xmlArgument):
         if xmlArgument is None:
-            exit(ERR_STRUCT)
+            raise InterpretError(ERR_STRUCT)
         self.type = xmlArgument.attrib['type']
         if self.type != 'label':
-            exit(ERR_TYPES)
+            raise InterpretError(ERR_TYPES)
         self.value = xmlArgument.text
 
     def __str__(self):
@@ -33,31 +45,28 @@ class Symbol(Argument):
     '''
     def __init__(self, xmlArgument):
         if xmlArgument is None:
-            exit(ERR_STRUCT)
+            raise InterpretError(ERR_STRUCT)
         self.type = xmlArgument.attrib['type']
         if self.type == 'var': # variable
             self.suffix, self.id = xmlArgument.text.split('@')
+            if self.suffix not in ('GF', 'LF', 'TF'):
+                raise InterpretError(ERR_STRUCT)
             self.value = None
         elif self.type == 'string':
-            self.suffix, self.value = self.type, xmlArgument.text
+            # empty element has no text, escape sequences are decoded once here instead of on every WRITE
+            self.suffix, self.value = self.type, decodeEscapes(xmlArgument.text or '')
         elif self.type == 'int':
             self.suffix, self.value = self.type, int(xmlArgument.text)
         elif self.type == 'nil':
-            self.suffix, self.value = self.type, xmlArgument.text
+            self.suffix, self.value = self.type, None
         elif self.type == 'bool':
             self.suffix = self.type
             if xmlArgument.text == 'true': self.value = True
             if xmlArgument.text == 'false': self.value = False
         else: 
-            exit(ERR_TYPES)
-
-    def set(self, attrDict):
-        for key in attrDict:
-            setattr(self, key, attrDict[key])
-
-    def getData(self, *retvalsSTR):
-        retvals = [getattr(self, attr) for attr in retvalsSTR]
-        return retvals
+            raise InterpretError(ERR_TYPES)
+        if self.type != 'var':
+            self.constant = Value(typeTags[self.type], self.value) # shared by all executions of instruction
 
     def __str__(self):
         return f'{self.suffix}@{self.id}:{self.type}@{self.value}'
@@ -68,21 +77,15 @@ class Variable(Argument):
     '''
     def __init__(self, xmlArgument):
         if xmlArgument is None:
-            exit(ERR_STRUCT)
+            raise InterpretError(ERR_STRUCT)
         self.type = xmlArgument.attrib['type']
         if self.type != 'var':
-            exit(ERR_TYPES)
+            raise InterpretError(ERR_TYPES)
         self.suffix, self.id = xmlArgument.text.split('@')
+        if self.suffix not in ('GF', 'LF', 'TF'):
+            raise InterpretError(ERR_STRUCT)
         self.value = None
 
-    def set(self, attrDict):
-        for key in attrDict:
-            setattr(self, key, attrDict[key])
-
-    def getData(self, *retvalsSTR):
-        retvals = [getattr(self, attr) for attr in retvalsSTR]
-        return retvals
-
     def __str__(self):
         return f'{self.suffix}@{self.id}:{self.type}@{self.value}'
 
@@ -92,10 +95,10 @@ class Type(Argument):
     '''
     def __init__(self, xmlArgument):
         if xmlArgument is None:
-            exit(ERR_STRUCT)
+            raise InterpretError(ERR_STRUCT)
         self.type = xmlArgument.attrib['type']
         if self.type != 'type':
-            exit(ERR_TYPES)
+            raise InterpretError(ERR_TYPES)
         self.value = xmlArgument.text
 
     def __str__(self):
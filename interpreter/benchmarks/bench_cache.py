@@ -0,0 +1,53 @@
+'''
+Measures startup time with the program cache (--cache-dir): without cache, cold (empty cache,
+program is parsed and stored) and warm (program is loaded from cache) for a small and a large program.
+
+Usage: python3 bench_cache.py [--interpreter=INTERPRET_PY] [--instructions=N] [--repeat=N]
+
+Both programs exit right after they are loaded, so the time is the startup time.
+'''
+import getopt
+import sys
+import tempfile
+
+from common import INTERPRETER, writeProgram, runInterpreter, bestOf
+from bench_load import largeProgram
+
+
+def coldStart(repeat, source, interpreter, directory):
+    '''
+    Returns the best wall time of runs with a new (empty) cache directory each
+    '''
+    times = []
+    for i in range(repeat):
+        time, _ = runInterpreter(source, interpreter, args=(f'--cache-dir={directory}/cold{i}',))
+        times.append(time)
+    return min(times)
+
+
+def main():
+    interpreter, instructions, repeat = INTERPRETER, 100000, 3
+    opts, _ = getopt.getopt(sys.argv[1:], '', ['interpreter=', 'instructions=', 'repeat='])
+    for opt, arg in opts:
+        if opt == '--interpreter':
+            interpreter = arg
+        elif opt == '--instructions':
+            instructions = int(arg)
+        elif opt == '--repeat':
+            repeat = int(arg)
+
+    print(f'{"program":<22} {"no cache":>10} {"cold":>10} {"warm":>10}')
+    with tempfile.TemporaryDirectory() as directory:
+        for name, size in (('small', 40), (f'large', instructions)):
+            source = writeProgram(largeProgram(size), directory)
+            warm = f'--cache-dir={directory}/warm'
+            plain = bestOf(repeat, source, interpreter)
+            cold = coldStart(repeat, source, interpreter, directory)
+            runInterpreter(source, interpreter, args=(warm,))
+            cached = bestOf(repeat, source, interpreter, args=(warm,))
+            label = f'{name} ({size} instr.)'
+            print(f'{label:<22} {plain*1000:>8.0f}ms {cold*1000:>8.0f}ms {cached*1000:>8.0f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+'''
+Measures instructions per second of the execution loop on a tight integer loop.
+
+Usage: python3 bench_dispatch.py [--interpreter=INTERPRET_PY] [--engine=ENGINE] [--iterations=N] [--repeat=N] [--stack]
+
+With --stack the loop is written with stack instructions (PUSHS, ADDS, LTS, JUMPIFEQS, ...).
+
+Startup time (measured on an empty program) is subtracted from wall time, so the result
+reflects only the dispatch loop. Run it with --interpreter pointing to an older interpret.py
+to compare versions.
+'''
+import getopt
+import sys
+import tempfile
+
+from common import INTERPRETER, writeProgram, countInstructions, bestOf
+
+
+def loopProgram(iterations):
+    return [
+        'DEFVAR GF@i',
+        'DEFVAR GF@sum',
+        'DEFVAR GF@cond',
+        'MOVE GF@i int@0',
+        'MOVE GF@sum int@0',
+        'LABEL loop',
+        'ADD GF@sum GF@sum GF@i',
+        'ADD GF@i GF@i int@1',
+        f'LT GF@cond GF@i int@{iterations}',
+        'JUMPIFEQ loop GF@cond bool@true',
+        'WRITE GF@sum']
+
+
+def stackLoopProgram(iterations):
+    return [
+        'DEFVAR GF@i',
+        'DEFVAR GF@sum',
+        'MOVE GF@i int@0',
+        'MOVE GF@sum int@0',
+        'LABEL loop',
+        'PUSHS GF@sum',
+        'PUSHS GF@i',
+        'ADDS',
+        'POPS GF@sum',
+        'PUSHS GF@i',
+        'PUSHS int@1',
+        'ADDS',
+        'POPS GF@i',
+        'PUSHS GF@i',
+        f'PUSHS int@{iterations}',
+        'LTS',
+        'PUSHS bool@true',
+        'JUMPIFEQS loop',
+        'WRITE GF@sum']
+
+
+def main():
+    interpreter, iterations, repeat, args, program = INTERPRETER, 20000, 3, (), loopProgram
+    opts, _ = getopt.getopt(sys.argv[1:], '', ['interpreter=', 'engine=', 'iterations=', 'repeat=', 'stack'])
+    for opt, arg in opts:
+        if opt == '--interpreter':
+            interpreter = arg
+        elif opt == '--engine':
+            args = (f'--engine={arg}',)
+        elif opt == '--iterations':
+            iterations = int(arg)
+        elif opt == '--repeat':
+            repeat = int(arg)
+        elif opt == '--stack':
+            program = stackLoopProgram
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = writeProgram(program(iterations), directory)
+        empty = writeProgram([], directory)
+        insts = countInstructions(source, directory, interpreter)
+        startup = bestOf(repeat, empty, interpreter, args=args)
+        plain = bestOf(repeat, source, interpreter, args=args) - startup
+        withStats = bestOf(repeat, source, interpreter, args=(*args, f'--stats={directory}/s.txt', '--insts', '--hot')) - startup
+
+    print(f'instructions executed: {insts}')
+    print(f'startup:               {startup*1000:.1f} ms')
+    print(f'without stats:         {insts/plain:,.0f} instructions/s')
+    print(f'with stats:            {insts/withStats:,.0f} instructions/s')
+
+
+if __name__ == '__main__':
+    main()
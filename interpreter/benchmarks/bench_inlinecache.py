@@ -0,0 +1,68 @@
+'''
+Measures effect of inline caches on a loop whose operand types can't be proven by type inference
+(the loop bounds are read by READ, so every arithmetic and comparison instruction keeps its type check).
+
+Usage: python3 bench_inlinecache.py [--interpreter=INTERPRET_PY] [--iterations=N] [--repeat=N]
+
+The program is executed without superinstructions (--no-peephole), so each checked instruction is
+a separate cached site, with and without inline caches (--no-inline-caches). Startup time (measured
+on an empty program) is subtracted from wall time.
+'''
+import getopt
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import INTERPRETER, writeProgram, countInstructions, bestOf
+
+
+def loopProgram():
+    return [
+        'DEFVAR GF@i',
+        'DEFVAR GF@n',
+        'DEFVAR GF@sum',
+        'DEFVAR GF@cond',
+        'READ GF@i int',
+        'READ GF@n int',
+        'MOVE GF@sum int@0',
+        'LABEL loop',
+        'ADD GF@sum GF@sum GF@i',
+        'ADD GF@i GF@i int@1',
+        'LT GF@cond GF@i GF@n',
+        'JUMPIFEQ loop GF@cond bool@true',
+        'WRITE GF@sum']
+
+
+def main():
+    interpreter, iterations, repeat = INTERPRETER, 20000, 3
+    opts, _ = getopt.getopt(sys.argv[1:], '', ['interpreter=', 'iterations=', 'repeat='])
+    for opt, arg in opts:
+        if opt == '--interpreter':
+            interpreter = arg
+        elif opt == '--iterations':
+            iterations = int(arg)
+        elif opt == '--repeat':
+            repeat = int(arg)
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = writeProgram(loopProgram(), directory)
+        empty = writeProgram([], directory)
+        inputFile = os.path.join(directory, 'input.txt')
+        with open(inputFile, 'w') as file:
+            file.write(f'0\n{iterations}\n')
+        insts = countInstructions(source, directory, interpreter, inputFile)
+        startup = bestOf(repeat, empty, interpreter, inputFile)
+        generic = bestOf(repeat, source, interpreter, inputFile, ('--no-peephole', '--no-inline-caches')) - startup
+        cached = bestOf(repeat, source, interpreter, inputFile, ('--no-peephole',)) - startup
+        command = [sys.executable, '-W', 'ignore', interpreter, f'--source={source}', f'--input={inputFile}', '--no-peephole', '--ic-stats']
+        report = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+
+    print(f'instructions executed:  {insts}')
+    print(f'without inline caches:  {insts/generic:,.0f} instructions/s')
+    print(f'with inline caches:     {insts/cached:,.0f} instructions/s')
+    print(report, end='')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+'''
+Measures READ throughput and memory: a loop that reads every line of a large input file.
+
+Usage: python3 bench_input.py [--interpreter=INTERPRET_PY] [--engine=ENGINE] [--lines=N] [--repeat=N]
+
+Time and peak RSS of the same program with an empty input file are subtracted, so the result
+reflects only reading of input. Run it with --interpreter pointing to an older interpret.py
+to compare versions.
+'''
+import getopt
+import os
+import sys
+import tempfile
+
+from common import INTERPRETER, writeProgram, peakMemory, bestOf
+
+
+def readProgram():
+    return [
+        'DEFVAR GF@line',
+        'DEFVAR GF@type',
+        'LABEL loop',
+        'READ GF@line string',
+        'TYPE GF@type GF@line',
+        'JUMPIFNEQ loop GF@type string@nil']
+
+
+def writeInput(lines, directory, name):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as file:
+        for i in range(lines):
+            file.write(f'line number {i}\n')
+    return path
+
+
+def main():
+    interpreter, lines, repeat, args = INTERPRETER, 200000, 3, ()
+    opts, _ = getopt.getopt(sys.argv[1:], '', ['interpreter=', 'engine=', 'lines=', 'repeat='])
+    for opt, arg in opts:
+        if opt == '--interpreter':
+            interpreter = arg
+        elif opt == '--engine':
+            args = (f'--engine={arg}',)
+        elif opt == '--lines':
+            lines = int(arg)
+        elif opt == '--repeat':
+            repeat = int(arg)
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = writeProgram(readProgram(), directory)
+        inputFile = writeInput(lines, directory, 'input.txt')
+        empty = writeInput(0, directory, 'empty.txt')
+        base = bestOf(repeat, source, interpreter, empty, args)
+        reading = bestOf(repeat, source, interpreter, inputFile, args) - base
+        memory = peakMemory(source, interpreter, inputFile, args)[0] - peakMemory(source, interpreter, empty, args)[0]
+
+    print(f'lines read:            {lines}')
+    print(f'reading:               {lines/reading:,.0f} lines/s')
+    print(f'memory:                {memory} KiB above empty input')
+
+
+if __name__ == '__main__':
+    main()
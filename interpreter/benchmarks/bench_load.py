@@ -0,0 +1,59 @@
+'''
+Measures program loading: wall time and peak RSS of a run of a large generated program
+that exits right after it is loaded.
+
+Usage: python3 bench_load.py [--interpreter=INTERPRET_PY] [--engine=ENGINE] [--instructions=N] [--repeat=N]
+
+Peak RSS of an empty program is reported as well, the difference is the cost of the loaded program.
+Run it with --interpreter pointing to an older interpret.py to compare versions.
+'''
+import getopt
+import sys
+import tempfile
+
+from common import INTERPRETER, writeProgram, peakMemory, bestOf
+
+
+def largeProgram(instructions):
+    '''
+    Generates lines of the program (not a list, so it is never kept in memory as a whole)
+    '''
+    yield 'EXIT int@0'
+    for i in range(instructions // 4):
+        yield f'LABEL l{i}'
+        yield f'DEFVAR GF@v{i}'
+        yield f'ADD GF@v{i} GF@v{i} int@{i}'
+        yield f'WRITE string@line\\032{i}'
+
+
+def main():
+    interpreter, instructions, repeat, args = INTERPRETER, 200000, 3, ()
+    opts, _ = getopt.getopt(sys.argv[1:], '', ['interpreter=', 'engine=', 'instructions=', 'repeat='])
+    for opt, arg in opts:
+        if opt == '--interpreter':
+            interpreter = arg
+        elif opt == '--engine':
+            args = (f'--engine={arg}',)
+        elif opt == '--instructions':
+            instructions = int(arg)
+        elif opt == '--repeat':
+            repeat = int(arg)
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = writeProgram(largeProgram(instructions), directory)
+        empty = writeProgram([], directory)
+        baseline, _ = peakMemory(empty, interpreter, args=args)
+        peak, returncode = peakMemory(source, interpreter, args=args)
+        startup = bestOf(repeat, empty, interpreter, args=args)
+        load = bestOf(repeat, source, interpreter, args=args) - startup
+    if returncode != 0:
+        print(f'interpreter failed with return code {returncode}', file=sys.stderr)
+        sys.exit(1)
+
+    print(f'instructions loaded:   {instructions}')
+    print(f'load time:             {load:.2f} s ({instructions/load:,.0f} instructions/s)')
+    print(f'peak RSS:              {peak/1024:.1f} MiB ({baseline/1024:.1f} MiB empty program)')
+
+
+if __name__ == '__main__':
+    main()
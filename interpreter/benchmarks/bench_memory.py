@@ -0,0 +1,70 @@
+'''
+Measures memory footprint of variables: peak RSS of a deep recursion where every call
+keeps a local frame full of variables and pushes values on the data stack.
+
+Usage: python3 bench_memory.py [--interpreter=INTERPRET_PY] [--engine=ENGINE] [--depth=N] [--variables=N]
+
+Peak RSS of an empty program is subtracted, the rest is divided by the number of live
+values (variables and data stack items). Run it with --interpreter pointing to an older
+interpret.py to compare versions.
+'''
+import getopt
+import sys
+import tempfile
+
+from common import INTERPRETER, writeProgram, peakMemory, bestOf
+
+
+def recursionProgram(depth, variables):
+    code = [
+        'DEFVAR GF@n',
+        'MOVE GF@n int@0',
+        'CALL f',
+        'WRITE GF@n',
+        'EXIT int@0',
+        'LABEL f',
+        'CREATEFRAME',
+        'PUSHFRAME']
+    for i in range(variables):
+        code += [f'DEFVAR LF@v{i}', f'MOVE LF@v{i} int@{i}', f'PUSHS LF@v{i}']
+    code += [
+        'ADD GF@n GF@n int@1',
+        f'JUMPIFEQ done GF@n int@{depth}',
+        'CALL f',
+        'LABEL done',
+        'RETURN']
+    return code
+
+
+def main():
+    interpreter, depth, variables, args = INTERPRETER, 10000, 20, ()
+    opts, _ = getopt.getopt(sys.argv[1:], '', ['interpreter=', 'engine=', 'depth=', 'variables='])
+    for opt, arg in opts:
+        if opt == '--interpreter':
+            interpreter = arg
+        elif opt == '--engine':
+            args = (f'--engine={arg}',)
+        elif opt == '--depth':
+            depth = int(arg)
+        elif opt == '--variables':
+            variables = int(arg)
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = writeProgram(recursionProgram(depth, variables), directory)
+        empty = writeProgram([], directory)
+        baseline, _ = peakMemory(empty, interpreter, args=args)
+        peak, returncode = peakMemory(source, interpreter, args=args)
+        time = bestOf(1, source, interpreter, args=args)
+    if returncode != 0:
+        print(f'interpreter failed with return code {returncode}', file=sys.stderr)
+        sys.exit(1)
+
+    values = 2 * depth * variables
+    print(f'live values:           {values}')
+    print(f'peak RSS:              {peak/1024:.1f} MiB ({baseline/1024:.1f} MiB empty program)')
+    print(f'per value:             {(peak - baseline)*1024/values:.0f} B')
+    print(f'time:                  {time:.2f} s')
+
+
+if __name__ == '__main__':
+    main()
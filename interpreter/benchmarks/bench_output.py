@@ -0,0 +1,68 @@
+'''
+Measures WRITE throughput: a loop that writes millions of short strings (with escape sequences),
+integers and booleans.
+
+Usage: python3 bench_output.py [--interpreter=INTERPRET_PY] [--engine=ENGINE] [--iterations=N] [--repeat=N]
+
+Each iteration executes 4 WRITE instructions, so the default 250000 iterations write 1 million
+values (use --iterations for more). Time of the same loop without WRITE instructions is subtracted,
+so the result reflects only the output path. Run it with --interpreter pointing to an older
+interpret.py to compare versions.
+'''
+import getopt
+import sys
+import tempfile
+
+from common import INTERPRETER, writeProgram, bestOf
+
+WRITES = 4                                              # WRITE instructions in one iteration
+
+
+def outputProgram(iterations, writes=True):
+    code = [
+        'DEFVAR GF@i',
+        'DEFVAR GF@cond',
+        'DEFVAR GF@s',
+        'MOVE GF@i int@0',
+        'MOVE GF@s string@x\\035y',
+        'LABEL loop']
+    if writes:
+        code += [
+            'WRITE string@ab\\032',
+            'WRITE GF@i',
+            'WRITE GF@s',
+            'WRITE bool@true']
+    code += [
+        'ADD GF@i GF@i int@1',
+        f'LT GF@cond GF@i int@{iterations}',
+        'JUMPIFEQ loop GF@cond bool@true']
+    return code
+
+
+def main():
+    interpreter, iterations, repeat, args = INTERPRETER, 250000, 3, ()
+    opts, _ = getopt.getopt(sys.argv[1:], '', ['interpreter=', 'engine=', 'iterations=', 'repeat='])
+    for opt, arg in opts:
+        if opt == '--interpreter':
+            interpreter = arg
+        elif opt == '--engine':
+            args = (f'--engine={arg}',)
+        elif opt == '--iterations':
+            iterations = int(arg)
+        elif opt == '--repeat':
+            repeat = int(arg)
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = writeProgram(outputProgram(iterations), directory)
+        loop = writeProgram(outputProgram(iterations, writes=False), directory)
+        total = bestOf(repeat, source, interpreter, args=args)
+        output = total - bestOf(repeat, loop, interpreter, args=args)
+
+    writes = iterations * WRITES
+    print(f'values written:        {writes}')
+    print(f'total time:            {total:.2f} s')
+    print(f'output:                {writes/output:,.0f} writes/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+'''
+Measures effect of superinstructions: number of dispatched handlers (executed lines of code)
+and wall time of a program with and without the peephole optimizer (--no-peephole).
+
+Usage: python3 bench_peephole.py [--interpreter=INTERPRET_PY] [--source=SOURCE_FILE] [--input=INPUT_FILE] [--repeat=N]
+
+By default the IFJ front-end output tests/xml.txt (tests/test.ifjcode) is used, reading tests/input.txt.
+Dispatches are counted in a separate process by a profile hook that counts handler calls made by the
+execution loop, so they don't depend on timing.
+'''
+import getopt
+import os
+import subprocess
+import sys
+
+from common import INTERPRETER, bestOf
+
+TESTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests')
+
+# counts calls of "exec*X*" handlers made directly by the execution loop
+counter = '''
+import os, sys
+interpreter, sys.argv = sys.argv[1], sys.argv[1:]
+sys.path.insert(0, os.path.dirname(os.path.abspath(interpreter)))
+import interpret
+count = 0
+def profile(frame, event, arg):
+    global count
+    if event == 'call' and frame.f_back is not None and frame.f_back.f_code.co_name == '__run':
+        count += 1
+sys.stdout = open(os.devnull, 'w')
+sys.setprofile(profile)
+try:
+    interpret.main()
+except SystemExit:
+    pass
+sys.setprofile(None)
+sys.stderr.write(f'{count}\\n')
+'''
+
+
+def countDispatches(source, interpreter, inputFile, args=()):
+    command = [sys.executable, '-c', counter, interpreter, f'--source={source}', f'--input={inputFile}', *args]
+    process = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return int(process.stderr.split()[-1])
+
+
+def main():
+    interpreter, repeat = INTERPRETER, 5
+    source, inputFile = os.path.join(TESTS, 'xml.txt'), os.path.join(TESTS, 'input.txt')
+    opts, _ = getopt.getopt(sys.argv[1:], '', ['interpreter=', 'source=', 'input=', 'repeat='])
+    for opt, arg in opts:
+        if opt == '--interpreter':
+            interpreter = arg
+        elif opt == '--source':
+            source = arg
+        elif opt == '--input':
+            inputFile = arg
+        elif opt == '--repeat':
+            repeat = int(arg)
+
+    original = countDispatches(source, interpreter, inputFile, ('--no-peephole',))
+    optimized = countDispatches(source, interpreter, inputFile)
+    plainTime = bestOf(repeat, source, interpreter, inputFile, ('--no-peephole',))
+    optimizedTime = bestOf(repeat, source, interpreter, inputFile)
+
+    print(f'dispatches without superinstructions: {original}')
+    print(f'dispatches with superinstructions:    {optimized} ({100 - 100*optimized/original:.1f} % less)')
+    print(f'wall time:                            {plainTime*1000:.1f} ms -> {optimizedTime*1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
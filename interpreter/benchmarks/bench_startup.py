@@ -0,0 +1,86 @@
+'''
+Measures startup of the interpreter on a trivial program: wall time over a bare Python process
+and modules imported on the way (python -X importtime), so that regressions of import-time work are visible.
+
+Usage: python3 bench_startup.py [--interpreter=INTERPRET_PY] [--repeat=N] [--top=N] [--budget=MS]
+
+Startup is the best wall time of N runs of a one-instruction program minus the best wall time of N runs
+of `python3 -c pass`. The slowest modules (by their own import time, children excluded) are listed.
+With --budget the script exits with 1 if startup exceeds given number of milliseconds.
+'''
+import getopt
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import INTERPRETER, writeProgram, bestOf
+
+
+def bareStartup(repeat):
+    '''
+    Returns the best wall time of an empty Python process
+    '''
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'])
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def importTimes(source, interpreter):
+    '''
+    Returns list of (own import time in microseconds, module name) of modules imported by the interpreter
+    which are not imported by a bare Python process
+    '''
+    def imports(command):
+        stderr = subprocess.run([sys.executable, '-X', 'importtime', *command], stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE, text=True).stderr
+        modules = {}
+        for line in stderr.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            own, _, name = line[len('import time:'):].split('|')
+            if own.strip().isdigit():                       # not the header line
+                modules[name.strip()] = int(own)
+        return modules
+
+    bare = imports(['-c', 'pass'])
+    return sorted(((own, name) for name, own in imports([interpreter, f'--source={source}']).items()
+        if name not in bare), reverse=True)
+
+
+def main():
+    interpreter, repeat, top, budget = INTERPRETER, 20, 15, None
+    opts, _ = getopt.getopt(sys.argv[1:], '', ['interpreter=', 'repeat=', 'top=', 'budget='])
+    for opt, arg in opts:
+        if opt == '--interpreter':
+            interpreter = arg
+        elif opt == '--repeat':
+            repeat = int(arg)
+        elif opt == '--top':
+            top = int(arg)
+        elif opt == '--budget':
+            budget = float(arg)
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = writeProgram(['WRITE string@ok'], directory)
+        bare = bareStartup(repeat)
+        wall = bestOf(repeat, source, interpreter)
+        modules = importTimes(source, interpreter)
+
+    startup = (wall - bare) * 1000
+    print(f'bare Python:        {bare*1000:.1f} ms')
+    print(f'interpreter:        {wall*1000:.1f} ms')
+    print(f'startup:            {startup:.1f} ms')
+    print(f'imported modules:   {len(modules)} ({sum(own for own, _ in modules)/1000:.1f} ms of import time)')
+    for own, name in modules[:top]:
+        print(f'{own/1000:8.2f} ms  {name}')
+    if budget is not None and startup > budget:
+        print(f'startup exceeds budget of {budget:g} ms', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
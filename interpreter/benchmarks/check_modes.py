@@ -0,0 +1,116 @@
+'''
+Regression check of execution modes: every program of the corpus is executed in the default mode, by the compiled
+engine, with -O and with both. Standard output, return code and --insts/--hot statistics of each mode have to be
+the same as those of the default mode, output and return code of the default mode the same as the expected ones.
+
+Usage: python3 check_modes.py [--interpreter=INTERPRET_PY] [--corpus=DIR] [--update]
+
+The corpus (tests/modes by default) is in the format of tester.php: program NAME.src, input NAME.in, expected
+output NAME.out and return code NAME.rc. It covers runtime errors 52-58, XML errors 31 and 32, BREAK, READ at
+the end of input and a function with more than 64 local variables (dynamic local frames). --update rewrites
+expected output and return code by the default mode (of a new program). Every difference is printed, the script
+exits with 1 if there is any.
+'''
+import getopt
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import INTERPRETER
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests', 'modes')
+
+# compared modes of shape <name> -> command line options, the first one is the reference
+MODES = {
+    'default' : (),
+    'compiled' : ('--engine=compiled',),
+    'O' : ('-O',),
+    'compiled-O' : ('--engine=compiled', '-O')}
+
+
+def runMode(interpreter, test, args, directory):
+    '''
+    Runs test program in one mode, returns (stdout, return code, statistics or None if they were not written)
+    '''
+    statsFile = os.path.join(directory, 'stats.txt')
+    if os.path.exists(statsFile):
+        os.remove(statsFile)
+    inputFile = test + '.in' if os.path.exists(test + '.in') else os.devnull
+    command = [sys.executable, interpreter, f'--source={test}.src', f'--input={inputFile}',
+        f'--stats={statsFile}', '--insts', '--hot', *args]
+    process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    stats = None
+    if os.path.exists(statsFile):
+        with open(statsFile) as file:
+            stats = file.read()
+    return process.stdout, process.returncode, stats
+
+
+def expected(test):
+    '''
+    Returns (expected stdout, expected return code) of test, missing files mean empty output and code 0
+    '''
+    output, code = b'', 0
+    if os.path.exists(test + '.out'):
+        with open(test + '.out', 'rb') as file:
+            output = file.read()
+    if os.path.exists(test + '.rc'):
+        with open(test + '.rc') as file:
+            code = int(file.read())
+    return output, code
+
+
+def checkTest(interpreter, test, directory, update):
+    '''
+    Runs test in all modes, returns list of differences
+    '''
+    name, differences = os.path.basename(test), []
+    results = {mode : runMode(interpreter, test, args, directory) for mode, args in MODES.items()}
+    reference = results['default']
+    if update:
+        with open(test + '.out', 'wb') as file:
+            file.write(reference[0])
+        with open(test + '.rc', 'w') as file:
+            file.write(f'{reference[1]}\n')
+    output, code = expected(test)
+    if reference[0] != output:
+        differences.append(f'{name} default: output differs from {name}.out')
+    if reference[1] != code:
+        differences.append(f'{name} default: return code {reference[1]}, expected {code}')
+    for mode, (output, code, stats) in results.items():
+        for what, value, referenceValue in (('output', output, reference[0]), ('return code', code, reference[1]),
+            ('statistics', stats, reference[2])):
+            if value != referenceValue:
+                differences.append(f'{name} {mode}: {what} differs from the default mode')
+    return differences
+
+
+def main():
+    interpreter, corpus, update = INTERPRETER, CORPUS, False
+    try:
+        opts, _ = getopt.getopt(sys.argv[1:], '', ['interpreter=', 'corpus=', 'update'])
+    except getopt.GetoptError as error:
+        sys.exit(f'{error}\n{__doc__}')
+    for opt, arg in opts:
+        if opt == '--interpreter':
+            interpreter = arg
+        elif opt == '--corpus':
+            corpus = arg
+        elif opt == '--update':
+            update = True
+
+    tests = sorted(os.path.join(corpus, name[:-4]) for name in os.listdir(corpus) if name.endswith('.src'))
+    differences = []
+    with tempfile.TemporaryDirectory() as directory:
+        for test in tests:
+            differences += checkTest(interpreter, test, directory, update)
+    for difference in differences:
+        print(difference)
+    print(f'{len(tests)} programs, {len(MODES)} modes, {len(differences)} differences')
+    if differences:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+'''
+Helpers shared by benchmark scripts: IPPcode22 program generation and interpreter runs
+'''
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from xml.sax.saxutils import escape
+
+INTERPRETER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'interpret.py')
+
+# argument kinds of instructions that don't take symbols
+labelArgs = {'CALL', 'LABEL', 'JUMP', 'JUMPIFEQS', 'JUMPIFNEQS', 'JUMPIFEQ', 'JUMPIFNEQ'}
+
+
+def xmlLines(code):
+    '''
+    Generates lines of XML representation of IPPcode22 lines (e.g. 'ADD GF@a GF@a int@1')
+    '''
+    yield '<?xml version="1.0" encoding="UTF-8"?>'
+    yield '<program language="IPPcode22">'
+    for order, line in enumerate(code, 1):
+        opCode, *args = line.split(' ')
+        opCode = opCode.upper()
+        if not args:
+            yield f'  <instruction order="{order}" opcode="{opCode}"/>'
+            continue
+        yield f'  <instruction order="{order}" opcode="{opCode}">'
+        for i, arg in enumerate(args, 1):
+            if i == 1 and opCode in labelArgs:
+                type, text = 'label', arg
+            elif i == 2 and opCode == 'READ':
+                type, text = 'type', arg
+            elif arg[:3] in ('GF@', 'LF@', 'TF@'):
+                type, text = 'var', arg
+            else:
+                type, text = arg.split('@', 1)
+            yield f'    <arg{i} type="{type}">{escape(text)}</arg{i}>'
+        yield '  </instruction>'
+    yield '</program>'
+
+
+def toXML(code):
+    '''
+    Converts list of IPPcode22 lines into XML representation
+    '''
+    return '\n'.join(xmlLines(code)) + '\n'
+
+
+def writeProgram(code, directory):
+    '''
+    Writes XML representation of given code (any iterable of lines, it is not kept in memory)
+    into a file in directory, returns its path
+    '''
+    fd, path = tempfile.mkstemp(suffix='.xml', dir=directory)
+    with os.fdopen(fd, 'w') as file:
+        for line in xmlLines(code):
+            file.write(line + '\n')
+    return path
+
+
+def runInterpreter(source, interpreter=INTERPRETER, inputFile=None, args=()):
+    '''
+    Runs interpreter as a separate process, returns (wall time in seconds, return code)
+    '''
+    command = [sys.executable, interpreter, f'--source={source}', *args]
+    if inputFile is not None:
+        command.append(f'--input={inputFile}')
+    start = time.perf_counter()
+    process = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start, process.returncode
+
+
+def peakMemory(source, interpreter=INTERPRETER, inputFile=None, args=()):
+    '''
+    Runs interpreter as a separate process, returns (peak resident set size in KiB, return code).
+    On Linux the child's peak includes RSS of this process at spawn time, so compare it with an empty program
+    and don't keep large generated programs in memory (see writeProgram)
+    '''
+    command = [sys.executable, interpreter, f'--source={source}', *args]
+    if inputFile is not None:
+        command.append(f'--input={inputFile}')
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return usage.ru_maxrss, process.returncode
+
+
+def countInstructions(source, directory, interpreter=INTERPRETER, inputFile=None):
+    '''
+    Returns number of executed instructions (--insts statistics)
+    '''
+    statsFile = os.path.join(directory, 'insts.txt')
+    runInterpreter(source, interpreter, inputFile, (f'--stats={statsFile}', '--insts'))
+    with open(statsFile) as file:
+        return int(file.read().split()[0])
+
+
+def bestOf(repeat, source, interpreter=INTERPRETER, inputFile=None, args=()):
+    '''
+    Returns the best wall time of given number of runs
+    '''
+    return min(runInterpreter(source, interpreter, inputFile, args)[0] for _ in range(repeat))
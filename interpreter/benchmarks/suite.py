@@ -0,0 +1,193 @@
+'''
+Benchmark suite: generated IPPcode22 workloads at several sizes, results as JSON to track regressions
+between versions of interpret.py.
+
+Usage: python3 suite.py [--interpreter=INTERPRET_PY] [--engine=ENGINE] [--workloads=NAME,...] [--sizes=SIZE,...]
+                        [--repeat=N] [--output=JSON_FILE] [--baseline=JSON_FILE]
+
+Workloads: loop (tight integer loop), recursion (deep CALL/RETURN with PUSHFRAME/POPFRAME), stack (stack
+instructions), strings (CONCAT, GETCHAR, SETCHAR), write (heavy WRITE), read (heavy READ); sizes: small,
+medium (default both) and large. For each workload and size the number of executed instructions (--insts),
+the best wall time of N runs, instructions per second (startup, measured on an empty program, is
+subtracted) and peak RSS are reported. With --baseline the results are compared with an older JSON
+report (e.g. of another --interpreter) and ratios of instructions per second are printed.
+'''
+import getopt
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from common import INTERPRETER, writeProgram, countInstructions, peakMemory, bestOf
+from bench_dispatch import loopProgram, stackLoopProgram
+from bench_output import outputProgram
+from bench_input import readProgram, writeInput
+
+SIZES = ('small', 'medium', 'large')
+
+
+def recursionProgram(depth):
+    '''
+    Recursive sum of 1..depth, every call passes its argument in a temporary frame
+    '''
+    return [
+        'DEFVAR GF@result',
+        'CREATEFRAME',
+        'DEFVAR TF@n',
+        f'MOVE TF@n int@{depth}',
+        'CALL sum',
+        'MOVE GF@result TF@s',
+        'WRITE GF@result',
+        'EXIT int@0',
+        'LABEL sum',
+        'PUSHFRAME',
+        'DEFVAR LF@s',
+        'MOVE LF@s int@0',
+        'JUMPIFEQ end LF@n int@0',
+        'CREATEFRAME',
+        'DEFVAR TF@n',
+        'SUB TF@n LF@n int@1',
+        'CALL sum',
+        'ADD LF@s LF@n TF@s',
+        'LABEL end',
+        'POPFRAME',
+        'RETURN']
+
+
+def stringsProgram(length):
+    '''
+    Builds a string of given length by CONCAT, then rewrites each of its characters
+    by GETCHAR and SETCHAR and builds its copy
+    '''
+    return [
+        'DEFVAR GF@s',
+        'DEFVAR GF@copy',
+        'DEFVAR GF@c',
+        'DEFVAR GF@i',
+        'DEFVAR GF@cond',
+        'MOVE GF@s string@',
+        'MOVE GF@copy string@',
+        'MOVE GF@i int@0',
+        'LABEL build',
+        'CONCAT GF@s GF@s string@a',
+        'ADD GF@i GF@i int@1',
+        f'LT GF@cond GF@i int@{length}',
+        'JUMPIFEQ build GF@cond bool@true',
+        'MOVE GF@i int@0',
+        'LABEL rewrite',
+        'GETCHAR GF@c GF@s GF@i',
+        'SETCHAR GF@s GF@i string@b',
+        'CONCAT GF@copy GF@copy GF@c',
+        'ADD GF@i GF@i int@1',
+        f'LT GF@cond GF@i int@{length}',
+        'JUMPIFEQ rewrite GF@cond bool@true',
+        'WRITE GF@s']
+
+
+# workloads of shape <name> -> (program generator, sizes (small, medium, large), whether size is number of input lines)
+workloads = {
+    'loop' : (loopProgram, (10000, 100000, 1000000), False),
+    'recursion' : (recursionProgram, (1000, 10000, 100000), False),
+    'stack' : (stackLoopProgram, (10000, 100000, 1000000), False),
+    'strings' : (stringsProgram, (1000, 10000, 50000), False),
+    'write' : (outputProgram, (10000, 100000, 1000000), False),
+    'read' : (lambda lines: readProgram(), (10000, 100000, 1000000), True)}
+
+
+def measure(name, size, interpreter, args, repeat, startup, directory):
+    '''
+    Runs one workload of given size, returns dictionary of results
+    '''
+    generator, sizes, readsInput = workloads[name]
+    units = sizes[SIZES.index(size)]
+    source = writeProgram(generator(units), directory)
+    inputFile = writeInput(units if readsInput else 0, directory, 'input.txt')
+    insts = countInstructions(source, directory, interpreter, inputFile)
+    wall = bestOf(repeat, source, interpreter, inputFile, args)
+    peak, returnCode = peakMemory(source, interpreter, inputFile, args)
+    os.remove(source)
+    return {
+        'workload' : name,
+        'size' : size,
+        'units' : units,
+        'instructions' : insts,
+        'wall' : round(wall, 6),
+        'instructionsPerSecond' : round(insts / max(wall - startup, 1e-9)),
+        'peakKiB' : peak,
+        'returnCode' : returnCode}
+
+
+def compare(results, baselineFile):
+    '''
+    Prints ratio of instructions per second of results and baseline report (> 1 is faster)
+    '''
+    with open(baselineFile) as file:
+        baseline = {(result['workload'], result['size']) : result for result in json.load(file)['results']}
+    for result in results:
+        old = baseline.get((result['workload'], result['size']))
+        if old is None:
+            continue
+        ratio = result['instructionsPerSecond'] / max(old['instructionsPerSecond'], 1)
+        print(f'{result["workload"]:<10} {result["size"]:<7} {ratio:6.2f}x instructions/s, ' \
+            f'wall {old["wall"]*1000:.1f} -> {result["wall"]*1000:.1f} ms, peak {old["peakKiB"]} -> {result["peakKiB"]} KiB',
+            file=sys.stderr)
+
+
+def main():
+    interpreter, args, repeat = INTERPRETER, (), 3
+    names, sizes, outputFile, baselineFile = list(workloads), ['small', 'medium'], None, None
+    try:
+        opts, _ = getopt.getopt(sys.argv[1:], '', ['interpreter=', 'engine=', 'workloads=', 'sizes=', 'repeat=', 'output=', 'baseline='])
+    except getopt.GetoptError as error:
+        sys.exit(f'{error}\n{__doc__}')
+    for opt, arg in opts:
+        if opt == '--interpreter':
+            interpreter = arg
+        elif opt == '--engine':
+            args = (f'--engine={arg}',)
+        elif opt == '--workloads':
+            names = arg.split(',')
+        elif opt == '--sizes':
+            sizes = arg.split(',')
+        elif opt == '--repeat':
+            repeat = int(arg)
+        elif opt == '--output':
+            outputFile = arg
+        elif opt == '--baseline':
+            baselineFile = arg
+    unknown = [name for name in names if name not in workloads] + [size for size in sizes if size not in SIZES]
+    if unknown:
+        sys.exit(f'unknown workload or size: {", ".join(unknown)}')
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        empty = writeProgram([], directory)
+        startup = bestOf(repeat, empty, interpreter, args=args)
+        emptyPeak, _ = peakMemory(empty, interpreter, args=args)
+        for name in names:
+            for size in sizes:
+                results.append(measure(name, size, interpreter, args, repeat, startup, directory))
+                print(f'{name:<10} {size:<7} {results[-1]["instructionsPerSecond"]:>12,} instructions/s', file=sys.stderr)
+
+    report = {
+        'interpreter' : os.path.abspath(interpreter),
+        'args' : list(args),
+        'python' : platform.python_version(),
+        'date' : time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'startup' : round(startup, 6),
+        'emptyPeakKiB' : emptyPeak,
+        'results' : results}
+    text = json.dumps(report, indent=2) + '\n'
+    if outputFile is None:
+        sys.stdout.write(text)
+    else:
+        with open(outputFile, 'w') as file:
+            file.write(text)
+    if baselineFile is not None:
+        compare(results, baselineFile)
+
+
+if __name__ == '__main__':
+    main()
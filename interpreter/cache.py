@@ -0,0 +1,160 @@
+import collections
+import gc
+import hashlib
+import io
+import marshal
+import mmap
+import os
+import sys
+
+from argument import Label, Symbol, Variable, Type
+from errorslist import ERR_INPUT, InterpretError
+from instruction import Instruction
+from program import Program
+from sets import typeTags
+from value import Value
+
+CACHE_FORMAT = 2                                            # version of cached program format, increase on any change of decoded representation
+
+argumentClasses = {cls.__name__ : cls for cls in (Label, Symbol, Variable, Type)}
+
+
+def readSource(source):
+    '''
+    Returns content (bytes) of source XML given by path or file object
+    '''
+    try:
+        if type(source) is str:
+            with open(source, 'rb') as file:
+                return file.read()
+        return source.buffer.read() if hasattr(source, 'buffer') else source.read()
+    except OSError:                                         # source file can't be opened or read
+        raise InterpretError(ERR_INPUT)
+
+
+def dumpProgram(program):
+    '''
+    Returns loaded program in marshal format (it is valid for the same cache format and Python version only)
+    '''
+    return marshal.dumps((CACHE_FORMAT, tuple(sys.version_info[:2]),
+        tuple(dumpInstruction(instruction) for instruction in program.instructions),
+        program.labels, program.globalNames, program.localNames, program.dynamicFrames))
+
+
+def restoreProgram(data):
+    '''
+    Returns program restored from marshal format (bytes or memory map), None if the data are not valid
+    '''
+    gc.disable()                                # only acyclic objects are created, collections would be wasted
+    try:
+        format, version, instructions, labels, globalNames, localNames, dynamicFrames = marshal.loads(data)
+        if format != CACHE_FORMAT or version != tuple(sys.version_info[:2]):
+            return None
+        instructions = tuple(restoreInstruction(*instruction) for instruction in instructions)
+    except (ValueError, EOFError, TypeError, KeyError):
+        return None
+    finally:
+        gc.enable()
+    return Program.restore(instructions, labels, globalNames, localNames, dynamicFrames)
+
+
+def dumpInstruction(instruction):
+    '''
+    Returns marshallable representation of instruction, constants' values are rebuilt on restore
+    '''
+    return (instruction.order, instruction.opCode, instruction.target, tuple(None if argument is None else
+        (type(argument).__name__, argument.type, argument.suffix, argument.value, argument.id, argument.key)
+        for argument in instruction.args))
+
+
+def restoreInstruction(order, opCode, target, args):
+    instruction = Instruction.__new__(Instruction)
+    instruction.order, instruction.opCode, instruction.target = order, opCode, target
+    instruction.args = tuple(None if argument is None else restoreArgument(*argument) for argument in args)
+    return instruction
+
+
+def restoreArgument(className, type, suffix, value, id, key):
+    cls = argumentClasses[className]
+    argument = cls.__new__(cls)
+    argument.type, argument.suffix, argument.value, argument.id, argument.key = type, suffix, value, id, key
+    if cls is Symbol and type != 'var':
+        argument.constant = Value(typeTags[type], value)
+    return argument
+
+
+class ProgramCache:
+    '''
+    On-disk cache of loaded (decoded and validated) programs. File name is the hash of source XML,
+    content is the program in marshal format, so a cached program is loaded without parsing XML
+    '''
+    def __init__(self, directory):
+        self.directory = directory
+
+    def load(self, source, factory):
+        '''
+        Returns program of given source (path or file object) from cache,
+        on cache miss loads it from XML and stores it into cache
+        '''
+        data = readSource(source)
+        path = os.path.join(self.directory, hashlib.sha256(data).hexdigest() + '.ippc')
+        program = self.__read(path)
+        if program is None:
+            program = factory.createProgram(io.BytesIO(data))
+            self.__write(path, program)
+        return program
+
+    def __read(self, path):
+        '''
+        Returns cached program, None if it is not in cache (or cache file is not valid)
+        '''
+        try:
+            with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as memory:
+                return restoreProgram(memory)
+        except (OSError, ValueError):
+            return None
+
+    def __write(self, path, program):
+        '''
+        Stores program into cache, cache is optional, so failure is silently ignored
+        '''
+        data = dumpProgram(program)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temporary = f'{path}.{os.getpid()}'
+            with open(temporary, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, path)         # other processes never see incomplete file
+        except OSError:
+            pass
+
+
+class ProgramMemoryCache:
+    '''
+    In-memory LRU cache of loaded programs keyed by hash of source XML (interpreter server keeps programs warm
+    between requests). Execution never modifies decoded programs, so a cached program serves any number of runs
+    '''
+    def __init__(self, size):
+        self.size = size                                    # maximum number of cached programs
+        self.programs = collections.OrderedDict()           # dictionary of shape <hash> -> Program, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, source, factory):
+        '''
+        Returns program of given source (path or file object) from cache,
+        on cache miss loads it from XML and stores it into cache
+        '''
+        data = readSource(source)
+        key = hashlib.sha256(data).digest()
+        program = self.programs.get(key)
+        if program is not None:
+            self.hits += 1
+            self.programs.move_to_end(key)
+            return program
+        self.misses += 1
+        program = factory.createProgram(io.BytesIO(data))
+        self.programs[key] = program
+        if len(self.programs) > self.size:
+            self.programs.popitem(last=False)
+        return program
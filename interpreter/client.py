@@ -0,0 +1,33 @@
+import os
+import socket
+import sys
+
+from protocol import defaultSocket, sendMessage, receiveMessage
+
+INTERPRETER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'interpret.py')
+
+
+def main():
+    '''
+    Thin client of server.py with the same command line interface as interpret.py,
+    if the server is not running, the program is executed by interpret.py in this process
+    '''
+    argv = sys.argv[1:]
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(defaultSocket())
+    except OSError:
+        connection.close()
+        os.execv(sys.executable, [sys.executable, INTERPRETER, *argv])
+    with connection:
+        socket.send_fds(connection, [b'\0'], [sys.stdin.fileno()]) # server reads source or input from it only if needed
+        sendMessage(connection, {'argv' : argv, 'cwd' : os.getcwd()})
+        response = receiveMessage(connection)
+    if response is None:                                    # server ended during the request
+        sys.exit(1)
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    sys.exit(response['code'])
+
+if __name__ == "__main__":
+    main()
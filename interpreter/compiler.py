@@ -0,0 +1,356 @@
+from errorslist import *
+from program import frameSize
+from sets import *
+from value import Value
+from iostream import text
+from instruction import originals
+
+# instructions that end a basic block
+blockEnds = {'JUMP', 'JUMPIFEQ', 'JUMPIFNEQ', 'JUMPIFEQS', 'JUMPIFNEQS', 'CALL', 'RETURN', 'EXIT', 'BREAK'}
+# instructions after which references to local and temporary frames have to be reloaded
+frameChanges = {'CREATEFRAME', 'PUSHFRAME', 'POPFRAME'}
+
+# binary expressions of shape <opCode> -> (operator of type rule, python expression)
+# {v1}, {v2} are replaced by operands' values
+expressions = {
+    'ADD' : ('+', '{v1} + {v2}'),
+    'SUB' : ('-', '{v1} - {v2}'),
+    'MUL' : ('*', '{v1} * {v2}'),
+    'IDIV' : ('//', '{v1} // {v2}'),
+    'DIV' : ('/', '{v1} / {v2}'),
+    'LT' : ('<', '{v1} < {v2}'),
+    'GT' : ('>', '{v1} > {v2}'),
+    'EQ' : ('==', '{v1} == {v2}'),
+    'NEQ' : ('!=', '{v1} != {v2}'),
+    'AND' : ('&&', '{v1} and {v2}'),
+    'OR' : ('||', '{v1} or {v2}'),
+    'CONCAT' : ('..', '{v1} + {v2}'),
+    'GETCHAR' : ('GC', '{v1}[int({v2})]')}
+# operand types passing type rules of shape <operator> -> source of set of (type 1, type 2) checked by generated code
+validTypes = {operator : '{' + ', '.join(repr((type1, type2)) for type1 in range(5) for type2 in range(5)
+    if operandTypesValid(operator, type1, type2)) + '}' for operator in typeRules}
+# stack instructions of shape <opCode> -> corresponding expression
+stackExpressions = {
+    'ADDS' : 'ADD', 'SUBS' : 'SUB', 'MULS' : 'MUL', 'IDIVS' : 'IDIV', 'DIVS' : 'DIV',
+    'LTS' : 'LT', 'GTS' : 'GT', 'EQS' : 'EQ', 'ANDS' : 'AND', 'ORS' : 'OR'}
+
+
+class CompiledProgram:
+    '''
+    Ahead-of-time translation of decoded program into Python source: one function per basic block,
+    jump targets are resolved to direct references to block functions. Instructions without
+    translation are executed by the corresponding Interpreter's "exec*X*" methods
+    '''
+    def __init__(self, instructions, collectStats, countVars=False):
+        self.instructions = instructions                    # tuple of (possibly optimized) instructions
+        self.collectStats = collectStats                    # whether blocks count their executions
+        self.countVars = countVars                          # whether CALL updates number of initialized variables
+        self.blocks = self.__findBlocks()                   # list of shape [(firstLine, lastLine + 1), ..]
+        self.source = self.__generate()                     # generated Python source
+        self.code = compile(self.source, '<IPPcode22>', 'exec')
+
+    def __findBlocks(self):
+        '''
+        Splits program into basic blocks, block ends after jump-like instruction or label.
+        Jumps continue right after the label, just like the interpreter's loop does (label itself
+        is executed only when reached sequentially, that matters for --hot stats)
+        '''
+        blocks, start = [], 0
+        for line, instruction in enumerate(self.instructions):
+            if instruction.opCode in blockEnds or instruction.opCode == 'LABEL':
+                blocks.append((start, line + 1))
+                start = line + 1
+        if start < len(self.instructions):
+            blocks.append((start, len(self.instructions)))
+        return blocks
+
+    def run(self, vm):
+        '''
+        Executes program using state (frames, stacks, stats) of given Interpreter class object
+        '''
+        counts = [0] * len(self.blocks)                     # number of executions of each block
+
+        def flush(exclude=None):
+            '''
+            Moves block counters into stats, exclude is an instruction that did not finish yet
+            '''
+            for index, (start, end) in enumerate(self.blocks):
+                if counts[index] == 0:
+                    continue
+                for instruction in self.instructions[start:end]:
+                    for original in originals(instruction):
+                        vm.stats.count(original, counts[index])
+                counts[index] = 0
+            if exclude is not None:
+                vm.stats.count(exclude, -1)
+
+        namespace = {}
+        exec(self.code, namespace)
+        block = namespace['build'](vm, self.instructions, counts, flush, Value, typeNames, InterpretError, ProgramExit, frameSize)
+        while block is not None:
+            block = block()
+        if self.collectStats:
+            flush()
+
+    def __generate(self):
+        '''
+        Generates source of the "build" function that returns the entry block
+        '''
+        self.lines = ['def build(vm, INS, COUNTS, flush, VALUE, NAMES, ERROR, EXITED, SIZE):',
+            '    GF = vm.GFrame',
+            '    NEWFRAME = vm.program.createFrame',
+            '    TYPES = vm.stackTypes',
+            '    VALUES = vm.stackValues',
+            '    CALLS = vm.callStack',
+            '    OUT = vm.output.write']
+        for index, (start, end) in enumerate(self.blocks):
+            self.__emitBlock(index, start, end)
+        self.lines.append(f'    return {self.__blockName(0)}')
+        return '\n'.join(self.lines) + '\n'
+
+    def __blockName(self, line):
+        '''
+        Returns name of the block function starting at given line (None for the end of program)
+        '''
+        return 'None' if line >= len(self.instructions) else f'B{line}'
+
+    def __emit(self, line, indent=2):
+        self.lines.append('    ' * indent + line)
+
+    def __emitBlock(self, index, start, end):
+        self.__emit(f'def {self.__blockName(start)}():', 1)
+        if self.collectStats:
+            self.__emit(f'COUNTS[{index}] += 1')
+        if any(self.__usesFrames(instruction) for instruction in self.instructions[start:end]):
+            self.__emit('LF = vm.LFrame; TF = vm.TFrame')
+        for line in range(start, end):
+            instruction = self.instructions[line]
+            generator = getattr(self, '_gen'+instruction.opCode, None)
+            if generator is None:
+                self.__fallback(line, instruction)
+                if instruction.opCode in frameChanges:
+                    self.__emit('LF = vm.LFrame; TF = vm.TFrame')
+            else:
+                generator(line, instruction)
+        if self.instructions[end - 1].opCode not in ('JUMP', 'CALL', 'RETURN', 'EXIT'):
+            self.__emit(f'return {self.__blockName(end)}')
+
+    def __usesFrames(self, instruction):
+        '''
+        Returns True if generated code of instruction refers to local or temporary frame
+        '''
+        return instruction.opCode in frameChanges or instruction.opCode == 'CALL' or \
+            any(argument is not None and argument.suffix in ('LF', 'TF') for argument in instruction.args)
+
+    def __fallback(self, line, instruction):
+        '''
+        Executes instruction by interpreter's handler
+        '''
+        self.__emit(f'vm.currentLine = {line}; vm.currentInstruction = INS[{line}]')
+        self.__emit(f'vm.exec{instruction.opCode}()')
+
+    def __operand(self, symbol, name):
+        '''
+        Returns (type expression, value expression, is constant), emits variable lookup if needed
+        '''
+        if symbol.id is None:
+            return repr(symbol.constant.type), repr(symbol.constant.value), True
+        if symbol.suffix == 'TF':
+            self.__emit(f'{name} = None if TF is None else TF[{symbol.key!r}]')
+        else:
+            self.__emit(f'{name} = {symbol.suffix}[{symbol.key!r}]')
+        self.__emit(f'if {name} is None: raise ERROR({ERR_NOFRAME})')
+        return f'{name}.type', f'{name}.value', False
+
+    def __frameCheck(self, variable):
+        '''
+        Emits check of temporary frame existence (the only frame that may not exist)
+        '''
+        if variable.suffix == 'TF':
+            self.__emit(f'if TF is None: raise ERROR({ERR_NOFRAME})')
+
+    def __typeCheck(self, condition, constant, code=ERR_TYPES):
+        '''
+        Emits type check, evaluates it right away if all operands are constants,
+        returns whether the check always fails (unconditional raise was emitted)
+        '''
+        if not constant:
+            self.__emit(f'if {condition}: raise ERROR({code})')
+            return False
+        if eval(condition):
+            self.__emit(f'raise ERROR({code})')
+            return True
+        return False
+
+    def __store(self, variable, type, value):
+        '''
+        Emits assignment of type and value expressions to given variable
+        '''
+        self.__emit(f'd = {variable.suffix}[{variable.key!r}]')
+        self.__emit(f'if d is None: raise ERROR({ERR_UNDECLVAR})')
+        self.__emit(f'd.value = {value}; d.type = {type}')
+
+    def __expression(self, opCode, t1, v1, t2, v2, constant, checked=True):
+        '''
+        Emits evaluation of binary expression into variable "r", returns result type,
+        type check is omitted if operand types are proven (see TypeInference)
+        '''
+        operator, expression = expressions[opCode]
+        type = typeRules[operator][0]
+        if constant:
+            condition = repr(not operandTypesValid(operator, eval(t1), eval(t2)))
+        else:
+            condition = f'({t1}, {t2}) not in {validTypes[operator]}'
+        if checked and self.__typeCheck(condition, constant):
+            return repr(type)                               # operation is never evaluated (operands may not support it)
+        self.__emit('try:')
+        self.__emit(f'r = {expression.format(v1=v1, v2=v2)}', 3)
+        self.__emit('except Exception:')
+        self.__emit(f'raise ERROR({ERR_VALUE})', 3)
+        return repr(type)
+
+    def __popTwo(self):
+        '''
+        Emits pop of the 2nd operand of binary stack instruction into "t2", "b" and read of the 1st one into "t1", "a"
+        '''
+        self.__emit(f'if len(TYPES) < 2: raise ERROR({ERR_UNDEFVAR})')
+        self.__emit('t2 = TYPES.pop(); b = VALUES.pop(); t1 = TYPES[-1]; a = VALUES[-1]')
+
+    def __jump(self, instruction):
+        '''
+        Returns statement that continues execution after the label instruction jumps to
+        '''
+        return f'return {self.__blockName(instruction.target + 1)}'
+
+    '''
+    Instruction list
+    '''
+    def _genLABEL(self, line, instruction):
+        pass
+
+    def _genCREATEFRAME(self, line, instruction):
+        self.__emit('vm.TFrame = TF = NEWFRAME()')
+
+    def _genPUSHFRAME(self, line, instruction):
+        self.__emit(f'if TF is None: raise ERROR({ERR_NOFRAME})')
+        self.__emit('vm.framesStack.append(LF); vm.LFrame = LF = TF; vm.TFrame = TF = None')
+
+    def _genCLEARS(self, line, instruction):
+        self.__emit('TYPES.clear(); VALUES.clear()')
+
+    def _genDEFVAR(self, line, instruction):
+        variable = instruction.args[0]
+        self.__frameCheck(variable)
+        self.__emit(f'if {variable.suffix}[{variable.key!r}] is not None: raise ERROR({ERR_SEMAN})')
+        self.__emit(f'{variable.suffix}[{variable.key!r}] = VALUE({TYPE_VAR}, None)')
+
+    def _genMOVE(self, line, instruction):
+        self.__frameCheck(instruction.args[0])
+        type, value, _ = self.__operand(instruction.args[1], 'a')
+        self.__store(instruction.args[0], type, value)
+
+    def _genSTRLEN(self, line, instruction):
+        type, value, _ = self.__operand(instruction.args[1], 'a')
+        self.__frameCheck(instruction.args[0])
+        self.__store(instruction.args[0], type, value)
+
+    def _genTYPE(self, line, instruction):
+        self.__frameCheck(instruction.args[0])
+        type, _, constant = self.__operand(instruction.args[1], 'a')
+        if constant:
+            self.__store(instruction.args[0], repr(TYPE_STRING), repr(typeNames[eval(type)]))
+        else:
+            self.__emit(f"r = '' if {type} == {TYPE_VAR} else NAMES[{type}]")
+            self.__store(instruction.args[0], repr(TYPE_STRING), 'r')
+
+    def _genNOT(self, line, instruction):
+        self.__frameCheck(instruction.args[0])
+        type, value, constant = self.__operand(instruction.args[1], 'a')
+        self.__typeCheck(f'{type} != {TYPE_BOOL}', constant)
+        self.__store(instruction.args[0], repr(TYPE_BOOL), f'not {value}')
+
+    def __genBinary(self, line, instruction):
+        self.__frameCheck(instruction.args[0])
+        t1, v1, constant1 = self.__operand(instruction.args[1], 'a')
+        t2, v2, constant2 = self.__operand(instruction.args[2], 'b')
+        type = self.__expression(instruction.opCode, t1, v1, t2, v2, constant1 and constant2, instruction.checked)
+        self.__store(instruction.args[0], type, 'r')
+
+    _genADD = _genSUB = _genMUL = _genIDIV = __genBinary
+    _genLT = _genGT = _genEQ = _genAND = _genOR = __genBinary
+    _genCONCAT = _genGETCHAR = __genBinary
+
+    def __genStack(self, line, instruction):
+        self.__popTwo()
+        opCode = stackExpressions[instruction.opCode]
+        type = self.__expression(opCode, 't1', 'a', 't2', 'b', False)
+        self.__emit('VALUES[-1] = r')
+        if typeRules[expressions[opCode][0]][1] != eval(type): # result type differs from operand type
+            self.__emit(f'TYPES[-1] = {type}')
+
+    _genADDS = _genSUBS = _genMULS = _genIDIVS = _genDIVS = __genStack
+    _genLTS = _genGTS = _genEQS = _genANDS = _genORS = __genStack
+
+    def _genNOTS(self, line, instruction):
+        self.__emit(f'if not TYPES: raise ERROR({ERR_UNDEFVAR})')
+        self.__emit(f'if TYPES[-1] != {TYPE_BOOL}: raise ERROR({ERR_TYPES})')
+        self.__emit('VALUES[-1] = not VALUES[-1]')
+
+    def _genPUSHS(self, line, instruction):
+        type, value, _ = self.__operand(instruction.args[0], 'a')
+        self.__emit(f'TYPES.append({type}); VALUES.append({value})')
+
+    def _genPOPS(self, line, instruction):
+        self.__emit(f'if not TYPES: raise ERROR({ERR_UNDEFVAR})')
+        self.__frameCheck(instruction.args[0])
+        self.__store(instruction.args[0], 'TYPES.pop()', 'VALUES.pop()')
+
+    def _genWRITE(self, line, instruction):
+        symbol = instruction.args[0]
+        if symbol.id is None: # constant is converted to text at compile time
+            if text(symbol.constant.type, symbol.constant.value):
+                self.__emit(f'OUT({text(symbol.constant.type, symbol.constant.value)!r})')
+            return
+        type, value, _ = self.__operand(symbol, 'a')
+        self.__emit(f'vm.write({type}, {value})')
+
+    def _genJUMP(self, line, instruction):
+        self.__emit(self.__jump(instruction))
+
+    def __genConditionalJump(self, line, instruction):
+        t1, v1, constant1 = self.__operand(instruction.args[1], 'a')
+        t2, v2, constant2 = self.__operand(instruction.args[2], 'b')
+        self.__expression(instruction.opCode[6:], t1, v1, t2, v2, constant1 and constant2, instruction.checked)
+        self.__emit(f'if r == True: {self.__jump(instruction)}')
+
+    _genJUMPIFEQ = _genJUMPIFNEQ = __genConditionalJump
+
+    def __genStackJump(self, line, instruction):
+        self.__popTwo()
+        self.__expression(instruction.opCode[6:-1], 't1', 'a', 't2', 'b', False)
+        self.__emit('TYPES.pop(); VALUES.pop()')
+        self.__emit(f'if r is True: {self.__jump(instruction)}')
+
+    _genJUMPIFEQS = _genJUMPIFNEQS = __genStackJump
+
+    def _genCALL(self, line, instruction):
+        self.__emit(f'CALLS.append({self.__blockName(line + 1)})')
+        if self.countVars:
+            self.__emit('vm.stats.updateVars(SIZE(GF) + (0 if TF is None else SIZE(TF)) - vm.stats.currentVars)')
+        self.__emit(self.__jump(instruction))
+
+    def _genRETURN(self, line, instruction):
+        self.__emit(f'if not CALLS: raise ERROR({ERR_UNDEFVAR})')
+        self.__emit('return CALLS.pop()')
+
+    def _genBREAK(self, line, instruction):
+        if self.collectStats:
+            self.__emit('flush()')
+        self.__fallback(line, instruction)
+
+    def _genEXIT(self, line, instruction):
+        type, value, _ = self.__operand(instruction.args[0], 'a')
+        self.__emit(f'if {type} != {TYPE_INT} or int({value}) > 49 or int({value}) < 0: raise ERROR({ERR_VALUE})')
+        if self.collectStats:
+            self.__emit(f'flush(INS[{line}])')
+        self.__emit(f'raise EXITED({value})')
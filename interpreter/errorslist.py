@@ -1,6 +1,9 @@
 __all__ = ['INTER_OK', 'ERR_PARAM', 'ERR_INPUT', 'ERR_OUTPUT', 'ERR_FORMAT', 
 'ERR_STRUCT', 'ERR_SEMAN', 'ERR_TYPES', 'ERR_UNDECLVAR', 'ERR_NOFRAME', 
-'ERR_UNDEFVAR', 'ERR_VALUE', 'ERR_STRING']
+'ERR_UNDEFVAR', 'ERR_VALUE', 'ERR_STRING', 'ERR_INTERNAL', 'InterpretError', 'ProgramExit',
+'ParameterError', 'InputError', 'OutputError', 'FormatError', 'StructureError', 'SemanticError',
+'OperandTypeError', 'UndefinedVariableError', 'FrameError', 'MissingValueError', 'OperandValueError', 'StringError',
+'InternalError']
 
 INTER_OK = 0
 ERR_PARAM = 10
@@ -14,4 +17,115 @@ ERR_UNDECLVAR = 54
 ERR_NOFRAME = 55
 ERR_UNDEFVAR = 56
 ERR_VALUE = 57
-ERR_STRING = 58
\ No newline at end of file
+ERR_STRING = 58
+ERR_INTERNAL = 99
+
+
+class InterpretError(Exception):
+    '''
+    Error of interpreted program (or of its source, input or command line arguments),
+    code is the return code of the interpreter. InterpretError(code) creates the subclass of the code
+    (e.g. InterpretError(ERR_TYPES) is OperandTypeError), so embedding code can catch errors by their kind
+    '''
+    code = None
+
+    def __new__(cls, code=None):
+        if cls is InterpretError:
+            cls = errorClasses.get(code, cls)
+        return super().__new__(cls, code)
+
+    def __init__(self, code=None):
+        code = self.code if code is None else code
+        super().__init__(code)
+        self.code = code
+
+
+class ParameterError(InterpretError):
+    '''
+    Invalid command line arguments (or options of the library API)
+    '''
+    code = ERR_PARAM
+
+class InputError(InterpretError):
+    '''
+    Source or input file can't be opened
+    '''
+    code = ERR_INPUT
+
+class OutputError(InterpretError):
+    '''
+    Output file can't be opened or written
+    '''
+    code = ERR_OUTPUT
+
+class FormatError(InterpretError):
+    '''
+    Source XML is not well-formed
+    '''
+    code = ERR_FORMAT
+
+class StructureError(InterpretError):
+    '''
+    Unexpected structure of source XML or invalid instruction (opcode, arguments, order)
+    '''
+    code = ERR_STRUCT
+
+class SemanticError(InterpretError):
+    '''
+    Undefined label or redefinition of label or variable
+    '''
+    code = ERR_SEMAN
+
+class OperandTypeError(InterpretError):
+    '''
+    Wrong types of operands
+    '''
+    code = ERR_TYPES
+
+class UndefinedVariableError(InterpretError):
+    '''
+    Access to variable that does not exist (its frame exists)
+    '''
+    code = ERR_UNDECLVAR
+
+class FrameError(InterpretError):
+    '''
+    Frame does not exist (e.g. reading from empty stack of frames)
+    '''
+    code = ERR_NOFRAME
+
+class MissingValueError(InterpretError):
+    '''
+    Missing value (uninitialized variable, empty data or call stack)
+    '''
+    code = ERR_UNDEFVAR
+
+class OperandValueError(InterpretError):
+    '''
+    Wrong value of operand (division by zero, wrong EXIT code)
+    '''
+    code = ERR_VALUE
+
+class StringError(InterpretError):
+    '''
+    Wrong work with string (index out of range, invalid character code)
+    '''
+    code = ERR_STRING
+
+class InternalError(InterpretError):
+    '''
+    Unexpected failure of the interpreter (the original exception is its __cause__)
+    '''
+    code = ERR_INTERNAL
+
+# exception classes of shape <return code> -> subclass of InterpretError
+errorClasses = {cls.code : cls for cls in InterpretError.__subclasses__()}
+
+
+class ProgramExit(Exception):
+    '''
+    Program ended by EXIT instruction, code is its return code
+    '''
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
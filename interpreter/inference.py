@@ -0,0 +1,149 @@
+import copy
+
+from sets import *
+
+__all__ = ['TypeInference', 'uncheckedSet']
+
+# instructions with unchecked variant (handler "execU*X*"), COMPAREJUMP is superinstruction of comparison and jump
+uncheckedSet = ('ADD', 'SUB', 'MUL', 'IDIV', 'LT', 'GT', 'EQ', 'AND', 'OR', 'CONCAT', 'JUMPIFEQ', 'JUMPIFNEQ', 'COMPAREJUMP')
+# operators of type rules of instructions that can be unchecked
+operators = {opCode : binaryOperators[opCode] for opCode in uncheckedSet if opCode in binaryOperators}
+# type of value stored into the first argument by instructions that succeed, of shape <opCode> -> type
+resultTypes = {
+    'ADD' : TYPE_INT, 'SUB' : TYPE_INT, 'MUL' : TYPE_INT, 'IDIV' : TYPE_INT, 'STRI2INT' : TYPE_INT,
+    'LT' : TYPE_BOOL, 'GT' : TYPE_BOOL, 'EQ' : TYPE_BOOL, 'AND' : TYPE_BOOL, 'OR' : TYPE_BOOL, 'NOT' : TYPE_BOOL,
+    'CONCAT' : TYPE_STRING, 'GETCHAR' : TYPE_STRING, 'SETCHAR' : TYPE_STRING, 'INT2CHAR' : TYPE_STRING, 'TYPE' : TYPE_STRING,
+    'DEFVAR' : TYPE_VAR}
+# types of values operations can be evaluated on without checks (uninitialized variable fails anyway)
+valueTypes = (TYPE_NIL, TYPE_INT, TYPE_BOOL, TYPE_STRING)
+
+
+class TypeInference:
+    '''
+    Forward dataflow analysis of types of variables. State of a program point is a dictionary of shape
+    <(frame, key)> -> type tag of variables whose type is the same on every path leading there (if the variable
+    is defined at all, undefined variable is reported before any type check). States are joined at the starts
+    of basic blocks, CALL continues at its label and RETURN at the line after any CALL. Instructions whose
+    operand types are proven to pass their type check are replaced by copies that are not checked at runtime
+    (checked is False), type check everywhere else stays, so type errors are reported exactly as before
+    '''
+    def __init__(self, instructions):
+        self.instructions = instructions                    # tuple of (possibly optimized) instructions
+        self.unchecked = 0                                  # number of instructions without type checks
+        self.blocks = self.__findBlocks()                   # dictionary of shape <firstLine> -> lastLine + 1
+        self.code = self.__annotate(self.__analyze())       # tuple of instructions with unchecked copies
+
+    def __findBlocks(self):
+        instructions, leaders = self.instructions, {0}
+        for line, instruction in enumerate(instructions):
+            if instruction.target is not None:
+                leaders.add(instruction.target)
+            if instruction.target is not None or instruction.opCode in ('RETURN', 'EXIT'):
+                leaders.add(line + 1)
+        leaders = sorted(leader for leader in leaders if leader < len(instructions))
+        return dict(zip(leaders, leaders[1:] + [len(instructions)]))
+
+    def __successors(self, line):
+        '''
+        Returns lines that may be executed after given line
+        '''
+        instruction = self.instructions[line]
+        opCode = instruction.opCode
+        if opCode == 'EXIT':
+            return []
+        if opCode == 'RETURN':
+            return self.returns
+        if opCode in ('JUMP', 'CALL'):
+            return [instruction.target]
+        if instruction.target is not None:              # conditional jump
+            return [instruction.target, line + 1]
+        return [line + 1]
+
+    def __analyze(self):
+        '''
+        Returns dictionary of shape <firstLine of block> -> state at its start, for blocks that may be executed
+        '''
+        length = len(self.instructions)
+        self.returns = [line + 1 for line, instruction in enumerate(self.instructions) if instruction.opCode == 'CALL']
+        states, pending = ({0 : {}}, [0]) if length else ({}, [])
+        while pending:
+            start = pending.pop()
+            state = dict(states[start])
+            for line in range(start, self.blocks[start]):
+                self.__transfer(self.instructions[line], state)
+            for successor in self.__successors(self.blocks[start] - 1):
+                if successor >= length:
+                    continue
+                if successor not in states:
+                    states[successor] = dict(state)
+                else:
+                    joined = {key : type for key, type in states[successor].items() if state.get(key) == type}
+                    if len(joined) == len(states[successor]):
+                        continue
+                    states[successor] = joined
+                pending.append(successor)
+        return states
+
+    def __transfer(self, instruction, state):
+        '''
+        Updates state by effect of given instruction
+        '''
+        opCode, args = instruction.opCode, instruction.args
+        if opCode == 'CREATEFRAME':
+            self.__forget(state, 'TF')
+        elif opCode == 'PUSHFRAME':
+            self.__forget(state, 'LF')
+            self.__rename(state, 'TF', 'LF')
+        elif opCode == 'POPFRAME':                          # frame that becomes local is not tracked
+            self.__forget(state, 'TF')
+            self.__rename(state, 'LF', 'TF')
+        elif opCode in ('MOVE', 'STRLEN'):                  # STRLEN stores its operand, just like MOVE
+            self.__assign(state, args[0], self.__typeOf(args[1], state))
+        elif opCode in resultTypes:
+            self.__assign(state, args[0], resultTypes[opCode])
+        elif opCode in ('READ', 'POPS'):
+            self.__assign(state, args[0], None)
+
+    def __forget(self, state, frame):
+        for key in [key for key in state if key[0] == frame]:
+            del state[key]
+
+    def __rename(self, state, frame, newFrame):
+        for key in [key for key in state if key[0] == frame]:
+            state[(newFrame, key[1])] = state.pop(key)
+
+    def __assign(self, state, variable, type):
+        if type is None:
+            state.pop((variable.suffix, variable.key), None)
+        else:
+            state[(variable.suffix, variable.key)] = type
+
+    def __typeOf(self, symbol, state):
+        '''
+        Returns type of symbol, None if it is not known
+        '''
+        if symbol.id is None:
+            return symbol.constant.type
+        return state.get((symbol.suffix, symbol.key))
+
+    def __passes(self, instruction, state):
+        '''
+        Returns True if operand types of instruction are known and pass its type check
+        '''
+        type1, type2 = self.__typeOf(instruction.args[1], state), self.__typeOf(instruction.args[2], state)
+        if type1 not in valueTypes or type2 not in valueTypes:
+            return False
+        return operandTypesValid(operators[instruction.opCode], type1, type2)
+
+    def __annotate(self, states):
+        code = list(self.instructions)
+        for start, state in states.items():
+            state = dict(state)
+            for line in range(start, self.blocks[start]):
+                instruction = code[line]
+                if instruction.opCode in operators and self.__passes(instruction, state):
+                    code[line] = copy.copy(instruction)
+                    code[line].checked = False
+                    self.unchecked += 1
+                self.__transfer(instruction, state)
+        return tuple(code)
@@ -0,0 +1,66 @@
+import copy
+
+from instruction import originals
+from sets import typeRules, typeNames, binaryOperators, operations
+
+__all__ = ['InlineCache', 'InlineCaches', 'cachedSet']
+
+# instructions with inline cache of shape <opCode> -> opCode of their cached variant (handler "exec*X*")
+cachedSet = {
+    'ADD' : 'CACHED', 'SUB' : 'CACHED', 'MUL' : 'CACHED', 'IDIV' : 'CACHED',
+    'LT' : 'CACHED', 'GT' : 'CACHED', 'EQ' : 'CACHED', 'AND' : 'CACHED', 'OR' : 'CACHED', 'CONCAT' : 'CACHED',
+    'JUMPIFEQ' : 'CACHEDJUMP', 'JUMPIFNEQ' : 'CACHEDJUMP'}
+
+
+class InlineCache:
+    '''
+    Inline cache of an instruction site: operand types that passed the type check last time. When the operands
+    have the same types again, the expression is evaluated without interpreting type rules (hit), otherwise
+    the instruction is executed by its generic handler and the cache is refilled if it succeeds (miss)
+    '''
+    __slots__ = ('opCode', 'function', 'type', 'type1', 'type2', 'hits', 'misses')
+
+    def __init__(self, opCode):
+        operator = binaryOperators[opCode]
+        self.opCode = opCode                            # opcode of the original instruction
+        self.function = operations[operator]            # expression, the same one the generic handler evaluates
+        self.type = typeRules[operator][0]              # type of result
+        self.type1 = self.type2 = None                  # cached operand types (None until the first execution)
+        self.hits = 0
+        self.misses = 0
+
+
+class InlineCaches:
+    '''
+    Attaches inline caches to instructions whose types are checked at runtime (copies with cached variant
+    opcode, original instruction stays in parts for statistics)
+    '''
+    def __init__(self, instructions):
+        self.sites = []                                     # list of instructions with inline cache
+        self.code = tuple(self.__attach(instruction) for instruction in instructions)
+
+    def __attach(self, instruction):
+        if not instruction.checked or instruction.opCode not in cachedSet:
+            return instruction
+        cached = copy.copy(instruction)
+        cached.opCode, cached.parts = cachedSet[instruction.opCode], originals(instruction)
+        cached.cache = InlineCache(instruction.opCode)
+        self.sites.append(cached)
+        return cached
+
+    def report(self):
+        '''
+        Returns diagnostic text with hit and miss counts of all executed sites, a site with just one miss
+        (the first execution) is monomorphic
+        '''
+        executed = [site for site in self.sites if site.cache.hits + site.cache.misses]
+        hits = sum(site.cache.hits for site in executed)
+        misses = sum(site.cache.misses for site in executed)
+        monomorphic = sum(site.cache.misses == 1 for site in executed)
+        lines = [f'Inline caches: {len(executed)} executed sites ({monomorphic} monomorphic), ' \
+            f'{hits} hits, {misses} misses ({100*hits/max(hits + misses, 1):.2f} % hits)']
+        for site in executed:
+            cache = site.cache
+            types = ','.join('-' if type is None else typeNames[type] for type in (cache.type1, cache.type2))
+            lines.append(f'\t{site.order}: {cache.opCode} {types} hits={cache.hits} misses={cache.misses}')
+        return '\n'.join(lines)
@@ -1,12 +1,17 @@
-import enum
-import xml.etree.ElementTree as ET
-
+import argument
 from sets import instructionSet
 from argument import *
 from errorslist import *
-import importlib
+from program import Program
+
+def originals(instruction):
+    '''
+    Returns tuple of decoded instructions the given (possibly optimized) instruction stands for
+    '''
+    return getattr(instruction, 'parts', (instruction,))
 
 class Instruction:
+    checked = True                                                          # False if operand types are proven (see TypeInference)
 
     def __init__(self, xmlInstruction):
         '''
@@ -17,16 +22,17 @@ class Instruction:
             self.order = int(xmlInstruction.attrib['order'])                # order
             self.opCode = xmlInstruction.attrib['opcode'].upper()           # opcode
         except:
-            exit(ERR_STRUCT)
+            raise InterpretError(ERR_STRUCT)
         # number of arguments, opcode, and xml element tag checks
         if self.opCode not in instructionSet or \
         len(instructionSet[self.opCode]) != len(list(xmlInstruction)) or \
         xmlInstruction.tag != 'instruction':
-            exit(ERR_STRUCT)
+            raise InterpretError(ERR_STRUCT)
         # sort xml arguments
         xmlInstruction[:] = sorted(xmlInstruction, key=lambda child: child.tag)   
-        # dynamically instantiate arguments
-        self.args = factory.createArguments(xmlInstruction, self.opCode) # arguments
+        # dynamically instantiate arguments (only once, at load time)
+        self.args = tuple(factory.createArguments(xmlInstruction, self.opCode)) # arguments
+        self.target = None                                                  # line of label (jumps and CALL), resolved by Program
             
     def __str__(self):
         return f'{self.order}: {self.opCode} {self.args[0]} {self.args[1]} {self.args[2]}'
@@ -46,14 +52,16 @@ class Factory:
             self._instance = super(Factory, self).__new__(self)
         return self._instance
 
+    def createProgram(self, source):
+        return Program(source, self)
+
     def createInstruction(self, xmlInstruction):
         return Instruction(xmlInstruction)
 
     def createArguments(self, xmlInstruction, opCode):
-        argument = importlib.import_module('argument')
         args = [None] * 3                              # list of Argument class objects
         for i, arg in enumerate(xmlInstruction):
             if arg.tag != f'arg{i+1}' or i > 2:
-                exit(ERR_STRUCT)
+                raise InterpretError(ERR_STRUCT)
             args[i] = getattr(argument, instructionSet[opCode][i])(xmlInstruction.find(f'arg{i+1}'))
         return args
\ No newline at end of file
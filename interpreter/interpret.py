@@ -1,61 +1,84 @@
-from asyncore import read
-import readline
-import xml.etree.ElementTree as ET
-import getopt
+import os
 import sys
-import re
+import time
 
 from instruction import *
 from sets import *
 from errorslist import *
 from stats import Stats
+from program import frameSize
+from value import Value
+from iostream import Input, Output, text
+from options import getOptions
     
 class Interpreter:
 
     def __init__(self):
-        self.xmlTree = None                             # XML tree of input XML code representation
+        self.program = None                             # Program class object (decoded instructions)
+        self.engine = 'interpreted'                     # execution engine, either 'interpreted' or 'compiled'
+        self.cacheDir = None                            # directory of loaded programs cache (no cache if None)
+        self.programCache = None                        # cache loading programs (ProgramCache, in-memory cache of server), None if not cached
+        self.peephole = True                            # whether interpreted program is optimized by superinstructions
+        self.optimize = False                           # whether constants are folded and dead code is dropped (-O)
+        self.inlineCaches = True                        # whether checked instructions of interpreted program have inline caches
+        self.cacheReport = False                        # whether hits and misses of inline caches are written to stderr
+        self.caches = None                              # InlineCaches class object (None if there are no inline caches)
+        self.profileFile = None                         # file of profile report (--profile)
+        self.profiler = None                            # Profiler class object (if program is profiled)
+        self.sampleFile = None                          # file of sampling profiler report (--sample)
+        self.sampleInterval = 0.001                     # seconds of CPU time between samples (--sample-interval)
+        self.sampler = None                             # Sampler class object (if program is sampled)
         self.inputFile = sys.stdin                      # text with input for source code interpretation
-        self.input = []                                 # input list (for case if there is input file)
-        self.orders = []                                # list of orders (no duplicates, all should be positive)
+        self.batchInputs = None                         # list of input files of batch mode (--batch), None if not in batch mode
+        self.batchOutput = '.'                          # directory of outputs of batch runs (--batch-output)
+        self.batchStats = ({}, None)                    # statistics options (statsGroups, jsonFile) given for the whole batch
+        self.jobs = 1                                   # number of worker processes of batch mode (--jobs)
+        self.prepared = None                            # (profile, engine, collectStats) once the program is prepared for execution
+        self.compiled = None                            # CompiledProgram class object (compiled engine)
+        self.input = None                               # Input class object, reads lines for READ lazily
+        self.output = Output()                          # buffered writer of program output
 
         self.stats = Stats()                            # Stats class attribute
         self.factory = Factory()                        # Factory class attribute
 
-        self.GFrame = {}                                # dictionary of global frame variables of shape <varID> -> Argument class object
-        self.LFrame = {}                                # dictionary on top of framesStack of shape <varID> -> Argument class object
-        self.TFrame = None                              # dictionary of temporary frame variables of shape <varID> -> Argument class object
+        self.GFrame = []                                # list of global frame variables of shape [slot] -> Value class object
+        self.LFrame = []                                # frame on top of framesStack (list, or DynamicFrame of shape <varID> -> Value class object)
+        self.TFrame = None                              # temporary frame, same shape as local frames
         self.framesStack = []                           # list of local frames
 
-        self.labelList = {}                             # dictionary of labels <labelName> -> line
         self.callStack = []                             # list of line numbers for return instructions 
 
         self.currentInstruction = None                  # Instruction class object
         self.currentLine = 0                            # current line of input code
-        self.dataStack = []                             # list of shape [[type, value], [type, value], ..]
+        self.code = ()                                  # executed instructions (program with superinstructions)
+        self.handlers = {}                              # dictionary of pre-bound handlers of shape <opCode> -> method
+        self.dispatch = ()                              # tuple of pre-bound handlers, one for each line of executed code
+        self.stackTypes = []                            # data stack, types of items (parallel to stackValues)
+        self.stackValues = []                           # data stack, values of items
     
-    def parseArguments(self):
+    def parseArguments(self, argv=None):
         ''' 
-        Parses command line arguments, finds source and input files, fills statsGroups dictionary
+        Parses command line arguments (sys.argv[1:] if not given), finds source and input files, fills statsGroups dictionary
         ''' 
-        try:
-            opts, _ = getopt.getopt(sys.argv[1:], '', ['help', 'source=', 'input=', 'stats=', 'insts', 'hot', 'vars'])
-        except getopt.GetoptError:
-            exit(ERR_PARAM)
+        argv = sys.argv[1:] if argv is None else argv
+        opts = getOptions(argv, 'O', ['help', 'source=', 'input=', 'stats=', 'insts', 'hot', 'vars', 'engine=', 'cache-dir=', 'no-peephole',
+            'no-inline-caches', 'ic-stats', 'stats-json=', 'profile=',
+            'sample=', 'sample-interval=', 'batch=', 'batch-output=', 'jobs='])
         tmpList, sIsPresent, iIsPresent, stIsPresent, xmlFile, statsFile = list(), 0, 0, 0, None, None
         for opt, arg in opts:
             if opt in ('--help'):
-                if len(sys.argv) != 2: # --help is present along with other command line options
-                    exit(ERR_PARAM)
+                if len(argv) != 1: # --help is present along with other command line options
+                    raise InterpretError(ERR_PARAM)
                 print(help)
-                exit(INTER_OK)
+                raise ProgramExit(INTER_OK)
             elif opt in ('--source'):
                 if sIsPresent == 1: # if there is more than 1 source file -> error
-                    exit(ERR_PARAM)
+                    raise InterpretError(ERR_PARAM)
                 sIsPresent = 1
                 xmlFile = arg
             elif opt in ('--input'): # if there is more than 1 input file -> error
                 if iIsPresent == 1:
-                    exit(ERR_PARAM)
+                    raise InterpretError(ERR_PARAM)
                 iIsPresent = 1
                 self.inputFile = arg
             elif opt in ('--stats'):
@@ -65,527 +88,970 @@ class Interpreter:
                     stIsPresent = 1
                 tmpList = list()
                 statsFile = arg
+            elif opt == '--engine':
+                if arg not in ('interpreted', 'compiled'):
+                    raise InterpretError(ERR_PARAM)
+                self.engine = arg
+            elif opt == '--cache-dir':
+                self.cacheDir = arg
+            elif opt == '--no-peephole':
+                self.peephole = False
+            elif opt == '--no-inline-caches':
+                self.inlineCaches = False
+            elif opt == '--ic-stats':
+                self.cacheReport = True
+            elif opt == '--stats-json':
+                self.stats.jsonFile = arg
+            elif opt == '--profile':
+                self.profileFile = arg
+            elif opt == '--sample':
+                from profiler import samplingSupported
+                if not samplingSupported:
+                    raise InterpretError(ERR_PARAM)
+                self.sampleFile = arg
+            elif opt == '--sample-interval':
+                try:
+                    self.sampleInterval = float(arg) / 1000
+                except ValueError:
+                    raise InterpretError(ERR_PARAM)
+                if self.sampleInterval <= 0:
+                    raise InterpretError(ERR_PARAM)
+            elif opt == '--batch':
+                if self.batchInputs is not None:
+                    raise InterpretError(ERR_PARAM)
+                self.batchInputs = self.__batchInputs(arg)
+            elif opt == '--batch-output':
+                self.batchOutput = arg
+            elif opt == '--jobs':
+                try:
+                    self.jobs = int(arg) or os.cpu_count() or 1 # 0 -> one worker per CPU core
+                except ValueError:
+                    raise InterpretError(ERR_PARAM)
+                if self.jobs < 0:
+                    raise InterpretError(ERR_PARAM)
+            elif opt == '-O':
+                self.optimize = True
             elif opt in ('--insts', '--hot', '--vars') and stIsPresent > 0:
                 tmpList.append(opt[2:]) # appends stat name to temporary list, will be added to statsGroups dictionary later
             else:
-                exit(ERR_PARAM)
+                raise InterpretError(ERR_PARAM)
             if stIsPresent == 1:
                 self.stats.statsGroups[statsFile] = tmpList
+        self.stats.countVars = self.stats.jsonFile is not None or any('vars' in group for group in self.stats.statsGroups.values())
         # no input and no source -> error
-        if sIsPresent == 0 and iIsPresent == 0:
-            exit(ERR_PARAM)
+        if sIsPresent == 0 and iIsPresent == 0 and self.batchInputs is None:
+            raise InterpretError(ERR_PARAM)
+        # batch runs have their own inputs, profiles would overwrite each other
+        if self.batchInputs is not None and (iIsPresent or self.profileFile is not None or self.sampleFile is not None):
+            raise InterpretError(ERR_PARAM)
+        if self.jobs != 1 and self.batchInputs is None:
+            raise InterpretError(ERR_PARAM)
             
         self.__readFile(xmlFile)
 
+    def __batchInputs(self, path):
+        '''
+        Returns list of input files of batch mode: files of given directory (sorted by name)
+        or files listed in given text file, one per line
+        '''
+        try:
+            if os.path.isdir(path):
+                return sorted(os.path.join(path, name) for name in os.listdir(path) if os.path.isfile(os.path.join(path, name)))
+            with open(path) as file:
+                inputs = [line.strip() for line in file if line.strip()]
+        except OSError:
+            raise InterpretError(ERR_INPUT)
+        names = {os.path.basename(inputFile) for inputFile in inputs}
+        if len(names) != len(inputs): # outputs are named by input file names, they would overwrite each other
+            raise InterpretError(ERR_PARAM)
+        return inputs
+
     def __readFile(self, xmlFile):
         '''
         Reads given files into 2 corresponding interpreter attributes
         '''
-        # xmlTree - root XMLElement (program)
+        # decode instructions once, while XML is being parsed, XML tree is not needed during execution
+        source = sys.stdin if xmlFile is None else xmlFile
+        if self.programCache is None and self.cacheDir is not None:
+            from cache import ProgramCache
+            self.programCache = ProgramCache(self.cacheDir)
+        if self.programCache is None:
+            self.program = self.factory.createProgram(source)
+        else:
+            self.program = self.programCache.load(source, self.factory)
+        # input file is opened now but its lines are read one by one by READ
+        self.input = Input(None if self.inputFile is sys.stdin else self.inputFile)
+        self.GFrame = self.program.createGlobalFrame()
+        self.LFrame = self.program.createFrame()
+        
+    def run(self):
+        '''
+        Executes the program, returns return code of the interpreter (0, code of EXIT or error code).
+        Output is flushed and reports are written in any case, statistics only if the program did not fail
+        '''
+        code, failed = INTER_OK, False
         try:
-            self.xmlTree = ET.parse(sys.stdin).getroot() if xmlFile is None else ET.parse(xmlFile).getroot()
-        except ET.ParseError:
-            exit(ERR_FORMAT)
-        if self.xmlTree.tag != 'program' or self.xmlTree.get('language') != 'IPPcode22':
-            exit(ERR_STRUCT)
-        if self.inputFile is not sys.stdin: # read input file into self.input list (if there is input file)
-            with open(self.inputFile, 'r') as file:
-                self.input = file.read().splitlines()
-        # sort instructions by order
+            self.executeProgram()
+        except ProgramExit as programExit:
+            code = programExit.code
+        except InterpretError as error:
+            code, failed = error.code, True
+        finally: # program end, EXIT or error
+            self.output.flush()
+            self.input.close()
+            self.writeProfile()
+            self.writeSamples()
+        if not failed:
+            self.stats.writeStats()
+        return code
+
+    def runBatch(self):
+        '''
+        Executes the loaded program once for each input file of the batch (on worker processes with --jobs),
+        prints input file, return code and seconds of execution of each run in order of the input files
+        '''
+        self.batchStats = (self.stats.statsGroups, self.stats.jsonFile)
+        if self.jobs > 1 and len(self.batchInputs) > 1:
+            from parallel import ParallelBatch
+            results = ParallelBatch(self, min(self.jobs, len(self.batchInputs))).run()
+        else:
+            results = map(self.runCase, self.batchInputs)
+        for inputFile, code, seconds in results:
+            print(f'{inputFile} {code} {seconds:.6f}')
+        return INTER_OK
+
+    def runCase(self, inputFile):
+        '''
+        Executes the loaded program with given input file, output (*.out), return code (*.rc) and statistics
+        are written into the batch output directory under name of the input file. Returns tuple of shape
+        (input file, return code, seconds of execution)
+        '''
+        statsGroups, jsonFile = self.batchStats
+        name = os.path.join(self.batchOutput, os.path.basename(inputFile))
+        self.stats.statsGroups = {f'{name}.{os.path.basename(fileName)}' : group for fileName, group in statsGroups.items()}
+        self.stats.jsonFile = None if jsonFile is None else f'{name}.{os.path.basename(jsonFile)}'
+        start = time.perf_counter()
         try:
-            self.xmlTree[:] = sorted(self.xmlTree, key=lambda child: int(re.search('\d+', child.get('order')).group()))
-        except:
-            exit(ERR_STRUCT)
-        
+            with open(name + '.out', 'w') as stream:
+                try:
+                    self.reset(inputFile, stream)
+                    code = self.run()
+                except InterpretError as error:         # input file can't be opened
+                    code = error.code
+                except OSError:                         # output can't be written
+                    raise
+                except Exception:                       # failure of the interpreter ends this case only
+                    import traceback
+                    print(f'{inputFile}:', file=sys.stderr)
+                    traceback.print_exc()
+                    code = ERR_INTERNAL
+            with open(name + '.rc', 'w') as file:
+                file.write(f'{code}\n')
+        except OSError:
+            raise InterpretError(ERR_OUTPUT)
+        return inputFile, code, time.perf_counter() - start
+
+    def reset(self, inputFile, stream):
+        '''
+        Prepares another execution of the loaded program: new frames, empty stacks and statistics,
+        READ reads given input file and output is written to given stream
+        '''
+        self.GFrame = self.program.createGlobalFrame()
+        self.LFrame = self.program.createFrame()
+        self.TFrame = None
+        self.framesStack = []
+        self.callStack = []
+        self.stackTypes = []
+        self.stackValues = []
+        self.currentInstruction = None
+        self.currentLine = 0
+        self.stats.reset()
+        self.output = Output(stream)
+        if self.input is not None:
+            self.input.close()
+        self.input = Input(inputFile)
+
     def executeProgram(self):
         '''
-        Iterates through input code 2 times,
-        first - finds all labels,
-        second - executes instructions
-        '''
-        for _, xmlInstruction in enumerate(self.xmlTree):
-            self.currentInstruction = self.factory.createInstruction(xmlInstruction)
-            if self.currentInstruction.order in self.orders or self.currentInstruction.order < 1:
-                exit(ERR_STRUCT)
-            self.orders.append(self.currentInstruction.order)
-            if self.currentInstruction.opCode == 'LABEL':
-                self.execL483L()
+        Executes pre-decoded instructions,
+        all labels were found and jump targets resolved during program loading
+        '''
+        if self.prepared is None: # executed code is prepared once, batch runs reuse it
+            self.prepared = self.__prepare()
+        profile, engine, collectStats = self.prepared
+        self.currentLine = 0
+        if collectStats:
+            self.stats.bind(self.program)
+        if self.sampleFile is not None:
+            from profiler import Sampler
+            self.sampler = Sampler(self, self.sampleInterval)
+            self.sampler.start()
+        try:
+            self.__execute(profile, engine, collectStats)
+        finally:
+            if self.sampler is not None:
+                self.sampler.stop()
+
+    def __prepare(self):
+        '''
+        Optimizes the program for the engine, binds handlers, returns (profile, engine, collectStats)
+        '''
+        # BREAK prints instruction counter, so it needs the counting loop as well
+        hasBreak = any(instruction.opCode == 'BREAK' for instruction in self.program)
+        collectStats = self.stats.requested() or hasBreak
+        # profiled program is interpreted line by line, so each line is one instruction of the profile,
+        # sampled program is interpreted as well (samples are current instruction and callStack of the loop)
+        profile = self.profileFile is not None
+        engine = 'interpreted' if profile or self.sampleFile is not None else self.engine
+        # BREAK prints current line, so the program is executed as it is (profiled one as well),
+        # passes are imported only when they are used
+        self.code = self.program.instructions
+        if self.optimize and not hasBreak and not profile:
+            from optimizer import Optimizer
+            self.code = Optimizer(self.code).code
+        from inference import TypeInference
+        self.code = TypeInference(self.code).code
+        if engine == 'interpreted' and self.peephole and not hasBreak and not profile:
+            from peephole import Peephole
+            self.code = Peephole(self.code).code
+        if engine == 'interpreted' and self.inlineCaches:
+            from inlinecache import InlineCaches
+            self.caches = InlineCaches(self.code)
+            self.code = self.caches.code
+        self.__bindHandlers()
+        if engine == 'compiled':
+            from compiler import CompiledProgram
+            self.compiled = CompiledProgram(self.code, collectStats, self.stats.countVars)
+        return profile, engine, collectStats
+
+    def __execute(self, profile, engine, collectStats):
+        '''
+        Executes code by the engine or loop that fits given options
+        '''
+        if profile:
+            from profiler import Profiler
+            self.profiler = Profiler(self.program)
+            self.__runWithProfile(collectStats)
+        elif engine == 'compiled':
+            self.compiled.run(self)
+        elif collectStats:
+            self.__runWithStats()
+        else:
+            self.__run()
+
+    def __bindHandlers(self):
+        '''
+        Resolves handler of each instruction once, so the execution loop does not look methods up by name
+        '''
+        handlers = self.handlers = {opCode : getattr(self, 'exec'+opCode) for opCode in instructionSet}
+        # superinstructions, instructions with inline cache and ones with proven operand types (they don't check them)
+        opCodes = tuple(instruction.opCode if instruction.checked else 'U'+instruction.opCode for instruction in self.code)
+        for opCode in opCodes:
+            if opCode not in handlers:
+                handlers[opCode] = getattr(self, 'exec'+opCode)
+        self.dispatch = tuple(handlers[opCode] for opCode in opCodes)
+
+    def __run(self):
+        '''
+        Execution loop without statistics collection
+        '''
+        code, dispatch, length = self.code, self.dispatch, len(self.code)
+        while self.currentLine < length:
+            self.currentInstruction = code[self.currentLine]
+            dispatch[self.currentLine]()
             self.currentLine += 1
 
-        self.currentLine = 0
-        while True:
-            self.currentInstruction = self.factory.createInstruction(self.xmlTree[self.currentLine])
-            getattr(self, 'exec'+self.currentInstruction.opCode)()
-            self.stats.updateInsts(self.currentInstruction)
-            self.stats.updateHot(self.currentInstruction)
+    def __runWithStats(self):
+        '''
+        Execution loop that updates statistics after each instruction
+        '''
+        code, dispatch, length = self.code, self.dispatch, len(self.code)
+        # optimized instruction is counted as its original parts (execution counters of decoded instructions),
+        # so stats describe the original program
+        parts = tuple(tuple(self.stats.lineOf(part) for part in originals(instruction)) for instruction in code)
+        executions = self.stats.executions
+        while self.currentLine < length:
+            line = self.currentLine
+            self.currentInstruction = code[line]
+            dispatch[line]()
+            for part in parts[line]:
+                executions[part] += 1
             self.currentLine += 1
-            if (self.currentLine == len(self.xmlTree)):
-                break
 
-    def __getValues(self, op, stack=False):
+    def __runWithProfile(self, collectStats):
         '''
-        Returns variables' values (if there are variables in expression), checks type compatibility
+        Execution loop that measures time of each instruction and of each CALL (see Profiler class),
+        profile is finished even if the program ends by EXIT or error
         '''
-        if stack is True:
-            opType2, opVal2 = self.dataStack.pop()
-            opType1, opVal1 = self.dataStack.pop()
-        else:
-            (opType1, opVal1), (opType2, opVal2) = \
-            self.currentInstruction.args[1].getData('suffix', 'id'), self.currentInstruction.args[2].getData('suffix', 'id')
-            if opType1 in ('GF', 'LF', 'TF'):
-                opType1, opVal1 = self.__findInFrame(opType1, opVal1)
-            else:
-                opType1, opVal1 = self.currentInstruction.args[1].getData('suffix', 'value')
-            if opType2 in ('GF', 'LF', 'TF'):
-                opType2, opVal2 = self.__findInFrame(opType2, opVal2)
-            else:
-                opType2, opVal2 = self.currentInstruction.args[2].getData('suffix', 'value')
-        # type compatibility checks
-        if op in ('+', '-', '//', '/', '*') and (opType1 != 'int' or opType2 != 'int'):
-            exit(ERR_TYPES)
-        if op in ('>', '<') and (opType1 != opType2):
-            exit(ERR_TYPES)
-        if op in ('==', '!=') and ((opType1 != opType2) and (opType1 != 'nil' and opType2 != 'nil')):
-            exit(ERR_TYPES)
-        if op in ('&&', '||') and (opType1 != 'bool' or opType2 != 'bool'):
-            exit(ERR_TYPES)
-        if op in ('..') and (opType1 != 'string' or opType2 != 'string'):
-            exit(ERR_TYPES)
-        if op in ('GC') and (opType1 != 'string' or opType2 != 'int'):
-            exit(ERR_TYPES)
-        if op in ('ORD'):
-            if (opType1 != 'string' or opType2 != 'int'):
-                exit(ERR_TYPES)
-            if len(opVal1) <= opVal2 or opVal2 < 0:
-                exit(ERR_STRING)
-
-        return opVal1, opVal2
-    
-    def __getType(self, op):
+        code, dispatch, length = self.code, self.dispatch, len(self.code)
+        profiler, clock = self.profiler, time.perf_counter_ns
+        counts, times, names = profiler.counts, profiler.times, profiler.names
+        parts = tuple(tuple(self.stats.lineOf(part) for part in originals(instruction)) for instruction in code) \
+            if collectStats else ((),) * length
+        executions = self.stats.executions
+        # lines of CALL and RETURN that change the function being executed
+        calls = tuple(instruction.opCode == 'CALL' for instruction in code)
+        returns = tuple(instruction.opCode == 'RETURN' for instruction in code)
+        line = None
+        now = clock()
+        profiler.start(now)
+        try:
+            while self.currentLine < length:
+                line = self.currentLine
+                self.currentInstruction = code[line]
+                start = clock()
+                dispatch[line]()
+                now = clock()
+                executed, line = line, None
+                counts[executed] += 1
+                times[executed] += now - start
+                if calls[executed]:
+                    profiler.enter(names[code[executed].target], now)
+                elif returns[executed]:
+                    profiler.leave(now)
+                for part in parts[executed]:
+                    executions[part] += 1
+                self.currentLine += 1
+        finally:
+            if line is not None:                        # instruction that ended the program (EXIT or error)
+                now = clock()
+                counts[line] += 1
+                times[line] += now - start
+            profiler.finish(now)
+
+    def __getValues(self, op):
         '''
-        Returns expression's result type
+        Returns variables' values (if there are variables in expression) and expression's result type,
+        checks type compatibility
         '''
-        if op in ('==', '!=', '>', '<', '&&', '||'):
-            type = 'bool'
-        elif op in ('+', '-', '*', '/', '//', 'ORD'):
-            type = 'int'
-        elif op in ('..', 'GC'):
-            type = 'string'
-        return type
+        operand1 = self.__getSymbol(self.currentInstruction.args[1])
+        operand2 = self.__getSymbol(self.currentInstruction.args[2])
+        opType1, opVal1, opType2, opVal2 = operand1.type, operand1.value, operand2.type, operand2.value
+        # type compatibility checks
+        if not operandTypesValid(op, opType1, opType2):
+            raise InterpretError(ERR_TYPES)
+        if op == 'ORD' and (len(opVal1) <= opVal2 or opVal2 < 0):
+            raise InterpretError(ERR_STRING)
 
-    def __evalExpr(self, lfunc, op, stack=False):
+        return typeRules[op][0], opVal1, opVal2
+
+    def __evalExpr(self, op):
         '''
-        Evaluates given expression
+        Evaluates expression of given operator
         '''
-        operand1, operand2 = self.__getValues(op, stack)
-        type = self.__getType(op)
-        # if one of operands is either 'nil' or None (None represents nil type)
+        type, operand1, operand2 = self.__getValues(op)
         try:
-            retval = lfunc(operand1, operand2)
+            retval = operations[op](operand1, operand2)
         except:
-            exit(ERR_VALUE)
-        if stack is True: self.dataStack.append((type, retval))
-        else: return type, retval
+            raise InterpretError(ERR_VALUE)
+        return type, retval
 
-    def __findFrame(self, frame):
-        frame =  getattr(self, frame+'rame')
+    def __popOperands(self, op):
+        '''
+        Pops the 2nd operand of binary stack instruction and checks types of both operands against type rule
+        of given operator, returns operands' values; the 1st operand stays on top of the stack to be replaced
+        by the result
+        '''
+        types, values = self.stackTypes, self.stackValues
+        if len(types) < 2:
+            raise InterpretError(ERR_UNDEFVAR)
+        type2 = types.pop()
+        if not operandTypesValid(op, types[-1], type2):
+            raise InterpretError(ERR_TYPES)
+        operand2 = values.pop()
+        return values[-1], operand2
+
+    def __findFrame(self, suffix):
+        frame = self.GFrame if suffix == 'GF' else self.LFrame if suffix == 'LF' else self.TFrame
         if frame is None:
-            exit(ERR_NOFRAME)
+            raise InterpretError(ERR_NOFRAME)
         return frame
+
+    def __findVariable(self, frame, key):
+        '''
+        Returns variable stored in given frame under key (slot number or variable name)
+        '''
+        variable = frame[key]
+        if variable is None: # variable was not defined
+            raise InterpretError(ERR_UNDECLVAR)
+        return variable
         
-    def __findInFrame(self, frame, id):
-        try:
-            type, value = getattr(self, frame+'rame')[id].getData('type', 'value')
-        except:
-            exit(ERR_NOFRAME)
-        return (type, value)
+    def __getSymbol(self, symbol):
+        '''
+        Returns Value class object of given symbol: constant's value or variable found in its frame
+        '''
+        if symbol.key is None:
+            return symbol.constant
+        suffix = symbol.suffix
+        frame = self.GFrame if suffix == 'GF' else self.LFrame if suffix == 'LF' else self.TFrame
+        if frame is None or frame[symbol.key] is None:
+            raise InterpretError(ERR_NOFRAME)
+        return frame[symbol.key]
 
     '''
     Instruction list
     '''
     def execCREATEFRAME(self):
-        self.TFrame = {}
+        self.TFrame = self.program.createFrame()
 
     def execPUSHFRAME(self):
         if self.TFrame is None:
-            exit(ERR_NOFRAME)
+            raise InterpretError(ERR_NOFRAME)
         self.framesStack.append(self.LFrame)
         self.LFrame = self.TFrame
         self.TFrame = None
 
     def execPOPFRAME(self):
         if self.LFrame is None:
-            exit(ERR_NOFRAME)
+            raise InterpretError(ERR_NOFRAME)
         if (len(self.framesStack) == 0):
-            if (len(self.LFrame) == 0):
-                exit(ERR_NOFRAME)
+            if (frameSize(self.LFrame) == 0):
+                raise InterpretError(ERR_NOFRAME)
             self.TFrame = self.LFrame
-            self.LFrame = {}
+            self.LFrame = self.program.createFrame()
+            if not self.stats.countVars:
+                return
             if self.TFrame is None:
                 self.stats.updateVars(-self.stats.currentVars)
             else:
-                self.stats.updateVars(len(self.TFrame)-self.stats.currentVars)
+                self.stats.updateVars(frameSize(self.TFrame)-self.stats.currentVars)
             return
         self.TFrame = self.LFrame
         self.LFrame = self.framesStack.pop()
+        if not self.stats.countVars:
+            return
         if self.TFrame is None: # len(None) causes error
-            self.stats.updateVars(len(self.GFrame)+len(self.LFrame)-self.stats.currentVars)
+            self.stats.updateVars(frameSize(self.GFrame)+frameSize(self.LFrame)-self.stats.currentVars)
         else: 
-            self.stats.updateVars(len(self.GFrame)+len(self.TFrame)+len(self.LFrame)-self.stats.currentVars)
+            self.stats.updateVars(frameSize(self.GFrame)+frameSize(self.TFrame)+frameSize(self.LFrame)-self.stats.currentVars)
 
     
     def execRETURN(self):
         if len(self.callStack) == 0:
-            exit(ERR_UNDEFVAR)
+            raise InterpretError(ERR_UNDEFVAR)
         self.currentLine = self.callStack.pop()
 
     def execBREAK(self):
-        print(f'Current position: {self.currentLine}\nGlobal frame: {self.GFrame}\nLocal frame: {self.LFrame}\n' \
-            f'Temporary frame: {self.TFrame}\nInstruction counter: {self.stats.insts}', file=sys.stderr)
+        GFrame = self.program.frameContents(self.GFrame, self.program.globalNames)
+        LFrame = self.program.frameContents(self.LFrame, self.program.localNames)
+        TFrame = self.program.frameContents(self.TFrame, self.program.localNames)
+        self.stats.update()
+        print(f'Current position: {self.currentLine}\nGlobal frame: {GFrame}\nLocal frame: {LFrame}\n' \
+            f'Temporary frame: {TFrame}\nInstruction counter: {self.stats.insts}', file=sys.stderr)
 
     def execCLEARS(self):
-        self.dataStack = []
+        self.stackTypes.clear()
+        self.stackValues.clear()
 
     def execCALL(self):
-        try:
-            self.callStack.append(self.currentLine)
-            self.currentLine = self.labelList[self.currentInstruction.args[0].value]
-            if self.TFrame is None: # len(None) causes error
-                self.stats.updateVars(len(self.GFrame)-self.stats.currentVars)
-            else:
-                self.stats.updateVars(len(self.GFrame)+len(self.TFrame)-self.stats.currentVars)
-        except KeyError: # label does not exist
-            exit(ERR_SEMAN)
+        self.callStack.append(self.currentLine)
+        self.currentLine = self.currentInstruction.target
+        if not self.stats.countVars:
+            return
+        if self.TFrame is None: # len(None) causes error
+            self.stats.updateVars(frameSize(self.GFrame)-self.stats.currentVars)
+        else:
+            self.stats.updateVars(frameSize(self.GFrame)+frameSize(self.TFrame)-self.stats.currentVars)
 
     def execLABEL(self):
         '''
-        All labels were detected before the code execution. See next method
+        All labels were detected during program loading (see Program class)
         '''
         pass
-    
-    def execL483L(self):
-        if self.currentInstruction.args[0].value in self.labelList:
-            exit(ERR_SEMAN)
-        self.labelList[self.currentInstruction.args[0].value] = self.currentLine
 
     def execJUMP(self):
-        try:
-            self.currentLine = self.labelList[self.currentInstruction.args[0].value]
-        except KeyError: # label does not exist
-            exit(ERR_SEMAN)
+        self.currentLine = self.currentInstruction.target
 
     def execJUMPIFEQS(self):
-        try:
-            self.__evalExpr(lambda a, b: a == b, '==', stack=True)
-            if self.dataStack.pop()[1] is True:
-                self.currentLine = self.labelList[self.currentInstruction.args[0].value]
-        except KeyError: # label does not exist
-            exit(ERR_SEMAN)
+        operand1, operand2 = self.__popOperands('==')
+        self.stackTypes.pop()
+        self.stackValues.pop()
+        if operand1 == operand2:
+            self.currentLine = self.currentInstruction.target
             
     def execJUMPIFNEQS(self):
-        try:
-            self.__evalExpr(lambda a, b: a != b, '!=', stack=True)
-            if self.dataStack.pop()[1] is True:
-                self.currentLine = self.labelList[self.currentInstruction.args[0].value]
-        except KeyError: # label does not exist
-            exit(ERR_SEMAN)
+        operand1, operand2 = self.__popOperands('!=')
+        self.stackTypes.pop()
+        self.stackValues.pop()
+        if operand1 != operand2:
+            self.currentLine = self.currentInstruction.target
             
     def execJUMPIFEQ(self):
-        try:
-            if self.__evalExpr(lambda a, b: a == b, '==')[1] == True:
-                self.currentLine = self.labelList[self.currentInstruction.args[0].value]
-        except KeyError: # label does not exist
-            exit(ERR_SEMAN)
+        if self.__evalExpr('==')[1] == True:
+            self.currentLine = self.currentInstruction.target
 
     def execJUMPIFNEQ(self):
-        try:
-            if self.__evalExpr(lambda a, b: a != b, '!=')[1] == True:
-                self.currentLine = self.labelList[self.currentInstruction.args[0].value]
-        except KeyError: # label does not exist
-            exit(ERR_SEMAN)
+        if self.__evalExpr('!=')[1] == True:
+            self.currentLine = self.currentInstruction.target
             
     def execDEFVAR(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        if id in frame: # attempt of variable redefinition
-            exit(ERR_SEMAN)
-        frame[id] = self.currentInstruction.args[0]
+        variable = self.currentInstruction.args[0]
+        frame = self.__findFrame(variable.suffix)
+        if frame[variable.key] is not None: # attempt of variable redefinition
+            raise InterpretError(ERR_SEMAN)
+        frame[variable.key] = Value(TYPE_VAR, None)
 
     def execPOPS(self):
-        if len(self.dataStack) == 0:
-            exit(ERR_UNDEFVAR)
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        type, value = self.dataStack.pop()
-        try:
-            frame[id].set({'type' : type, 'value' : value})
-        except KeyError:
-            exit(ERR_UNDECLVAR)
+        if len(self.stackTypes) == 0:
+            raise InterpretError(ERR_UNDEFVAR)
+        variable = self.currentInstruction.args[0]
+        frame = self.__findFrame(variable.suffix)
+        variable = self.__findVariable(frame, variable.key)
+        variable.type, variable.value = self.stackTypes.pop(), self.stackValues.pop()
 
     def execPUSHS(self):
-        type, id, value = self.currentInstruction.args[0].getData('suffix', 'id', 'value')
-        if type in ('GF', 'LF', 'TF'):
-            type, value = self.__findInFrame(type, id)
-        self.dataStack.append((type, value))
+        operand = self.__getSymbol(self.currentInstruction.args[0])
+        self.stackTypes.append(operand.type)
+        self.stackValues.append(operand.value)
 
     def execWRITE(self):
-        type, id, toPrint = self.currentInstruction.args[0].getData('suffix', 'id', 'value')
-        if id is not None:
-            type, toPrint = self.__findInFrame(type, id)
-        if type == 'string': # convert all escape sequences 
-            toPrint = re.sub(r'\\([0-9]{3})', lambda x: chr(int(x[1])), toPrint)
-        if type == 'bool': # convert bool2str
-            toPrint = str(toPrint).lower()
-        if toPrint == 'nil': 
-            toPrint = ''
-        print(toPrint, end='', file=sys.stdout)
+        operand = self.__getSymbol(self.currentInstruction.args[0])
+        self.write(operand.type, operand.value)
+
+    def write(self, type, toPrint):
+        '''
+        Writes value of given type to buffered output, strings are already decoded
+        '''
+        self.output.write(toPrint if type == TYPE_STRING else text(type, toPrint))
 
     def execEXIT(self):
-        type, id, value = self.currentInstruction.args[0].getData('suffix', 'id', 'value')
-        if id is not None:
-            type, value = self.__findInFrame(type, id)
-        if type != 'int' or int(value) > 49 or int(value) < 0:
-            exit(ERR_VALUE)
-        self.stats.writeStats()
-        exit(value)
+        operand = self.__getSymbol(self.currentInstruction.args[0])
+        type, value = operand.type, operand.value
+        if type != TYPE_INT or int(value) > 49 or int(value) < 0:
+            raise InterpretError(ERR_VALUE)
+        raise ProgramExit(value)
         
     def execDPRINT(self):
-        type, id, toPrint = self.currentInstruction.args[0].getData('suffix', 'id', 'value')
-        if id is not None:
-            type, toPrint = self.__findInFrame(type, id)
-        print(toPrint, end='', file=sys.stderr)
+        operand = self.__getSymbol(self.currentInstruction.args[0])
+        print('nil' if operand.type == TYPE_NIL else operand.value, end='', file=sys.stderr)
 
     def execNOTS(self):
-        type, value = self.dataStack.pop()
-        if type != 'bool':
-            exit(ERR_TYPES)
-        self.dataStack.append((type, not value))
+        if len(self.stackTypes) == 0:
+            raise InterpretError(ERR_UNDEFVAR)
+        if self.stackTypes[-1] != TYPE_BOOL:
+            raise InterpretError(ERR_TYPES)
+        self.stackValues[-1] = not self.stackValues[-1]
         
     def execINT2CHARS(self):
-        type, value = self.dataStack.pop()
-        if type != 'int': 
-            exit(ERR_TYPES)
-        if not (0 <= value <= 255):
-            exit(ERR_STRING)
-        self.dataStack.append(('string', chr(value)))
+        types, values = self.stackTypes, self.stackValues
+        if len(types) == 0:
+            raise InterpretError(ERR_UNDEFVAR)
+        if types[-1] != TYPE_INT: 
+            raise InterpretError(ERR_TYPES)
+        if not (0 <= values[-1] <= 255):
+            raise InterpretError(ERR_STRING)
+        types[-1], values[-1] = TYPE_STRING, chr(values[-1])
 
     def execSTRI2INTS(self):
-        self.__evalExpr(lambda a, b : ord(a[b]), 'ORD', stack=True)
+        types, values = self.stackTypes, self.stackValues
+        if len(types) < 2:
+            raise InterpretError(ERR_UNDEFVAR)
+        if types.pop() != TYPE_INT or types[-1] != TYPE_STRING:
+            raise InterpretError(ERR_TYPES)
+        index = values.pop()
+        if not (0 <= index < len(values[-1])):
+            raise InterpretError(ERR_STRING)
+        types[-1], values[-1] = TYPE_INT, ord(values[-1][index])
 
     def execADDS(self):
-        self.__evalExpr(lambda a, b : a + b, '+', stack=True)
+        operand1, operand2 = self.__popOperands('+')
+        self.stackValues[-1] = operand1 + operand2
 
     def execSUBS(self):
-        self.__evalExpr(lambda a, b : a - b, '-', stack=True)
+        operand1, operand2 = self.__popOperands('-')
+        self.stackValues[-1] = operand1 - operand2
 
     def execMULS(self):
-        self.__evalExpr(lambda a, b : a * b, '*', stack=True)
+        operand1, operand2 = self.__popOperands('*')
+        self.stackValues[-1] = operand1 * operand2
 
     def execDIVS(self):
-        self.__evalExpr(lambda a, b : a / b, '/', stack=True)
+        operand1, operand2 = self.__popOperands('/')
+        if operand2 == 0:
+            raise InterpretError(ERR_VALUE)
+        self.stackValues[-1] = operand1 / operand2
         
     def execIDIVS(self):
-        self.__evalExpr(lambda a, b : a // b, '//', stack=True)
+        operand1, operand2 = self.__popOperands('//')
+        if operand2 == 0:
+            raise InterpretError(ERR_VALUE)
+        self.stackValues[-1] = operand1 // operand2
         
     def execLTS(self):
-        self.__evalExpr(lambda a, b : a < b, '<', stack=True)
+        operand1, operand2 = self.__popOperands('<')
+        try:
+            self.stackValues[-1] = operand1 < operand2
+        except TypeError: # uninitialized variables
+            raise InterpretError(ERR_VALUE)
+        self.stackTypes[-1] = TYPE_BOOL
 
     def execGTS(self):
-        self.__evalExpr(lambda a, b : a > b, '>', stack=True)
+        operand1, operand2 = self.__popOperands('>')
+        try:
+            self.stackValues[-1] = operand1 > operand2
+        except TypeError: # uninitialized variables
+            raise InterpretError(ERR_VALUE)
+        self.stackTypes[-1] = TYPE_BOOL
 
     def execEQS(self):
-        self.__evalExpr(lambda a, b : a == b, '==', stack=True)
+        operand1, operand2 = self.__popOperands('==')
+        self.stackTypes[-1], self.stackValues[-1] = TYPE_BOOL, operand1 == operand2
 
     def execANDS(self):
-        self.__evalExpr(lambda a, b : a and b, '&&', stack=True)
+        operand1, operand2 = self.__popOperands('&&')
+        self.stackValues[-1] = operand1 and operand2
 
     def execORS(self):
-        self.__evalExpr(lambda a, b : a or b, '||', stack=True)
+        operand1, operand2 = self.__popOperands('||')
+        self.stackValues[-1] = operand1 or operand2
 
     def execMOVE(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        type, value, id1 = self.currentInstruction.args[1].getData('suffix', 'value', 'id')
-        #print("MOVE ", frame, "@", id, " ", type, "@", id1)
-        frame = self.__findFrame(frame)
-        if type in ('GF', 'LF', 'TF'): # if variable -> find in given frame
-            type, value = self.__findInFrame(type, id1)
-        try:
-            frame[id].set({'value' : value, 'type' : type})
-        except KeyError: 
-            exit(ERR_UNDECLVAR)
+        destination = self.currentInstruction.args[0]
+        frame = self.__findFrame(destination.suffix)
+        operand = self.__getSymbol(self.currentInstruction.args[1])
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = operand.type, operand.value
 
     def execINT2CHAR(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        type, id1, value = self.currentInstruction.args[1].getData('suffix', 'id', 'value')
-        frame = self.__findFrame(frame)
-        if type in ('LF', 'GF', 'TF'):
-            type, value = self.__findInFrame(type, id1)
+        destination = self.currentInstruction.args[0]
+        frame = self.__findFrame(destination.suffix)
+        value = self.__getSymbol(self.currentInstruction.args[1]).value
         if not (0 <= value <= 1114111): # invalid value 0 <= i <= 0x10ffff
-            exit(ERR_STRING)
-        value = chr(value)
-        frame[id].set({'type' : 'string', 'value' : value})
+            raise InterpretError(ERR_STRING)
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = TYPE_STRING, chr(value)
 
-        
     def execSTRLEN(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        type, id1, value = self.currentInstruction.args[1].getData('suffix', 'id', 'value')
-        if type in ('GF', 'LF', 'TF'):
-            type, value = self.__findInFrame(type, id1)
-        frame = self.__findFrame(frame)
-        
-        frame[id].set({'type' : type, 'value' : value})
+        destination = self.currentInstruction.args[0]
+        operand = self.__getSymbol(self.currentInstruction.args[1])
+        frame = self.__findFrame(destination.suffix)
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = operand.type, operand.value
 
     def execTYPE(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        type, id1 = self.currentInstruction.args[1].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        if type in ('GF', 'LF', 'TF'): # if variable -> find in given frame
-            type, _ = self.__findInFrame(type, id1)
-        try:
-            frame[id].set({'value' : '' if type == 'var' else type, 'type' : 'string'})
-        except KeyError:
-            exit(ERR_UNDECLVAR)
+        destination = self.currentInstruction.args[0]
+        frame = self.__findFrame(destination.suffix)
+        type = self.__getSymbol(self.currentInstruction.args[1]).type
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = TYPE_STRING, '' if type == TYPE_VAR else typeNames[type]
 
     def execNOT(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        type, value, id1 = self.currentInstruction.args[1].getData('suffix', 'value', 'id')
-        frame = self.__findFrame(frame)
-        if type in ('GF', 'LF', 'TF'): # if variable -> find in given frame
-            type, value = self.__findInFrame(type, id1)
-        if type != 'bool':
-            exit(ERR_TYPES)
-        try:
-            frame[id].set({'value' : not value, 'type' : 'bool'})
-        except KeyError: 
-            exit(ERR_UNDECLVAR)
+        destination = self.currentInstruction.args[0]
+        frame = self.__findFrame(destination.suffix)
+        operand = self.__getSymbol(self.currentInstruction.args[1])
+        if operand.type != TYPE_BOOL:
+            raise InterpretError(ERR_TYPES)
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = TYPE_BOOL, not operand.value
+
+    def __binary(self, op):
+        '''
+        Evaluates expression of 2 symbols and stores the result into the first argument (variable)
+        '''
+        destination = self.currentInstruction.args[0]
+        frame = self.__findFrame(destination.suffix)
+        type, value = self.__evalExpr(op)
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = type, value
         
     def execADD(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        type, value = self.__evalExpr(lambda a, b : a + b, '+')
-        frame[id].set({'type' : type, 'value' : value})
+        self.__binary('+')
         
     def execSUB(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        type, value = self.__evalExpr(lambda a, b : a - b, '-')
-        frame[id].set({'type' : type, 'value' : value})
+        self.__binary('-')
         
     def execMUL(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        type, value = self.__evalExpr(lambda a, b : a * b, '*')
-        frame[id].set({'type' : type, 'value' : value})
+        self.__binary('*')
         
     def execIDIV(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        type, value = self.__evalExpr(lambda a, b : a // b, '//')
-        frame[id].set({'type' : type, 'value' : value})
+        self.__binary('//')
         
     def execLT(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        type, value = self.__evalExpr(lambda a, b : a < b, '<')
-        frame[id].set({'type' : type, 'value' : value})
+        self.__binary('<')
 
     def execGT(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        type, value = self.__evalExpr(lambda a, b : a > b, '>')
-        frame[id].set({'type' : type, 'value' : value})
+        self.__binary('>')
 
     def execEQ(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        type, value = self.__evalExpr(lambda a, b : a == b, '==')
-        frame[id].set({'type' : type, 'value' : value})
+        self.__binary('==')
 
     def execAND(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        type, value = self.__evalExpr(lambda a, b : a and b, '&&')
-        frame[id].set({'type' : type, 'value' : value})
+        self.__binary('&&')
 
     def execOR(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        type, value = self.__evalExpr(lambda a, b : a or b, '||')
-        frame[id].set({'type' : type, 'value' : value})
+        self.__binary('||')
 
     def execSTRI2INT(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        type, value = self.__evalExpr(lambda a, b : ord(a[b]), 'ORD', stack=True)
-        frame[id].set({'type' : type, 'value' : value})
+        self.__binary('ORD')
         
     def execCONCAT(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        type, value = self.__evalExpr(lambda a, b : a + b, '..')
-        frame[id].set({'type' : type, 'value' : value})
+        self.__binary('..')
 
     def execGETCHAR(self):
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
-        frame = self.__findFrame(frame)
-        type, value = self.__evalExpr(lambda a, b : a[int(b)], 'GC')
-        frame[id].set({'type' : type, 'value' : value})
+        self.__binary('GC')
 
     def execSETCHAR(self):
-        frame, id = self.currentInstruction.args[0].getData('frame', 'id')
-        type, value = self.__findInFrame(frame, id)
-        if type != 'string' or value == '' or value is None:
-            exit(ERR_TYPES)
-        frame = self.__findFrame(frame)
-        type1, id1, value1 = self.currentInstruction.args[1].getData('suffix', 'id', 'value')
-        type2, id2, value2 = self.currentInstruction.args[2].getData('suffix', 'id', 'value')
-        if id1 is not None: # if symb1 (int) is variable
-            type1, value1 = self.__findInFrame(type1, id1)
-        if type1 != 'int':
-            exit(ERR_TYPES)
-        if not (0 <= value1 < len(value)):
-            exit(ERR_STRING)
-        if id2 is not None: # if symb2 (string) is variable
-            type2, value2 = self.__findInFrame(type2, id2)
-        if type2 != 'string':
-            exit(ERR_TYPES)
-        if value2 == '' or value2 is None:
-            exit(ERR_STRING)
-        frame[id].set({'value' : value[:value1] + value2[0] + value[value1+1:]})
+        destination = self.currentInstruction.args[0]
+        operand = self.__getSymbol(destination)
+        type, value = operand.type, operand.value
+        if type != TYPE_STRING or value == '' or value is None:
+            raise InterpretError(ERR_TYPES)
+        frame = self.__findFrame(destination.suffix)
+        operand1 = self.__getSymbol(self.currentInstruction.args[1])
+        if operand1.type != TYPE_INT:
+            raise InterpretError(ERR_TYPES)
+        if not (0 <= operand1.value < len(value)):
+            raise InterpretError(ERR_STRING)
+        operand2 = self.__getSymbol(self.currentInstruction.args[2])
+        if operand2.type != TYPE_STRING:
+            raise InterpretError(ERR_TYPES)
+        if operand2.value == '' or operand2.value is None:
+            raise InterpretError(ERR_STRING)
+        self.__findVariable(frame, destination.key).value = value[:operand1.value] + operand2.value[0] + value[operand1.value+1:]
 
     def execREAD(self):
-        if self.inputFile is sys.stdin: # read from stdin
-            readLine = input()
-        else:                           # read from input file
-            readLine = self.input[0]
-            self.input = self.input[1:]
-        frame, id = self.currentInstruction.args[0].getData('suffix', 'id')
+        readLine = self.input.readLine()
+        destination = self.currentInstruction.args[0]
         readType = self.currentInstruction.args[1].value
-        frame = self.__findFrame(frame)
-        if readType == 'int':
-            newValue = int(readLine)
-            newType = 'int'
-        if readType == 'string':
+        frame = self.__findFrame(destination.suffix)
+        if readLine is None: # input is exhausted
+            readLine = ''
+        elif readType == 'int':
+            try:
+                newValue = int(readLine)
+                newType = TYPE_INT
+            except ValueError: # not a number, nil@nil is read instead
+                readLine = ''
+        elif readType == 'string':
             newValue = str(readLine)
-            newType = 'string'
-        if readType == 'bool':
+            newType = TYPE_STRING
+        elif readType == 'bool':
             if readLine.lower() == 'true': newValue = True
             elif readLine.lower() == 'false': newValue = False
-            else: exit(ERR_TYPES)
-            newType = 'bool'
+            else: raise InterpretError(ERR_TYPES)
+            newType = TYPE_BOOL
         if readLine == '':
-            newValue = 'nil'
-            newType = 'nil'
+            newValue = None
+            newType = TYPE_NIL
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = newType, newValue
+
+    '''
+    Superinstructions (see Peephole class), each behaves exactly as the sequence of its parts
+    '''
+    def execSTACKEXPR(self):
+        fused = self.currentInstruction
+        types, values = self.stackTypes, self.stackValues
+        operand = self.__getSymbol(fused.args[1])
+        types.append(operand.type)
+        values.append(operand.value)
+        operand = self.__getSymbol(fused.args[2])
+        types.append(operand.type)
+        values.append(operand.value)
+        self.handlers[fused.operation]()
+        destination = fused.args[0]
+        variable = self.__findVariable(self.__findFrame(destination.suffix), destination.key)
+        variable.type, variable.value = types.pop(), values.pop()
+
+    def execCALLWITHARGS(self):
+        self.TFrame = self.program.createFrame()
+        for variable, symbol in self.currentInstruction.pairs:
+            self.__defineMoved(variable, symbol)
+        self.execCALL()
+
+    def execCOMPAREJUMP(self):
+        fused = self.currentInstruction
+        destination = fused.args[0]
+        frame = self.__findFrame(destination.suffix)
+        type, value = self.__evalExpr(fused.operator)
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = type, value
+        if value == fused.condition:
+            self.currentLine = fused.target
+
+    def execDEFMOVE(self):
+        self.__defineMoved(*self.currentInstruction.args)
+
+    def execPUSHPOPS(self):
+        destination, symbol = self.currentInstruction.args
+        operand = self.__getSymbol(symbol)
+        variable = self.__findVariable(self.__findFrame(destination.suffix), destination.key)
+        variable.type, variable.value = operand.type, operand.value
+
+    def execRETURNFRAME(self):
+        self.execPOPFRAME()
+        self.execRETURN()
+
+    '''
+    Instructions with operand types proven by TypeInference class, they behave as the checked ones otherwise
+    '''
+    def __typedOperands(self):
+        '''
+        Returns (frame of destination, destination, value of 1st operand, value of 2nd operand)
+        '''
+        destination, symbol1, symbol2 = self.currentInstruction.args
+        frame = self.__findFrame(destination.suffix)
+        return frame, destination, self.__getSymbol(symbol1).value, self.__getSymbol(symbol2).value
+
+    def execUADD(self):
+        frame, destination, operand1, operand2 = self.__typedOperands()
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = TYPE_INT, operand1 + operand2
+
+    def execUSUB(self):
+        frame, destination, operand1, operand2 = self.__typedOperands()
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = TYPE_INT, operand1 - operand2
+
+    def execUMUL(self):
+        frame, destination, operand1, operand2 = self.__typedOperands()
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = TYPE_INT, operand1 * operand2
+
+    def execUIDIV(self):
+        frame, destination, operand1, operand2 = self.__typedOperands()
+        if operand2 == 0:
+            raise InterpretError(ERR_VALUE)
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = TYPE_INT, operand1 // operand2
+
+    def execULT(self):
+        frame, destination, operand1, operand2 = self.__typedOperands()
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = TYPE_BOOL, operand1 < operand2
+
+    def execUGT(self):
+        frame, destination, operand1, operand2 = self.__typedOperands()
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = TYPE_BOOL, operand1 > operand2
+
+    def execUEQ(self):
+        frame, destination, operand1, operand2 = self.__typedOperands()
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = TYPE_BOOL, operand1 == operand2
+
+    def execUAND(self):
+        frame, destination, operand1, operand2 = self.__typedOperands()
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = TYPE_BOOL, operand1 and operand2
+
+    def execUOR(self):
+        frame, destination, operand1, operand2 = self.__typedOperands()
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = TYPE_BOOL, operand1 or operand2
+
+    def execUCONCAT(self):
+        frame, destination, operand1, operand2 = self.__typedOperands()
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = TYPE_STRING, operand1 + operand2
+
+    def execUJUMPIFEQ(self):
+        _, symbol1, symbol2 = self.currentInstruction.args
+        if self.__getSymbol(symbol1).value == self.__getSymbol(symbol2).value:
+            self.currentLine = self.currentInstruction.target
+
+    def execUJUMPIFNEQ(self):
+        _, symbol1, symbol2 = self.currentInstruction.args
+        if self.__getSymbol(symbol1).value != self.__getSymbol(symbol2).value:
+            self.currentLine = self.currentInstruction.target
+
+    def execUCOMPAREJUMP(self):
+        fused = self.currentInstruction
+        frame, destination, operand1, operand2 = self.__typedOperands()
+        value = fused.function(operand1, operand2)
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = TYPE_BOOL, value
+        if value == fused.condition:
+            self.currentLine = fused.target
+
+    '''
+    Instructions with inline cache (see InlineCaches class), operand types that are the same as the last time
+    are not checked again, other types are checked by the generic handler (the same errors in the same order)
+    '''
+    def execCACHED(self):
+        instruction = self.currentInstruction
+        cache = instruction.cache
+        destination, symbol1, symbol2 = instruction.args
+        frame = self.__findFrame(destination.suffix)
+        operand1, operand2 = self.__getSymbol(symbol1), self.__getSymbol(symbol2)
+        type1, type2 = operand1.type, operand2.type
+        if type1 != cache.type1 or type2 != cache.type2:
+            cache.misses += 1
+            self.handlers[cache.opCode]()
+            cache.type1, cache.type2 = type1, type2     # the generic handler exits if the types don't pass
+            return
+        cache.hits += 1
         try:
-            frame[id].set({'type' : newType, 'value' : newValue})
-        except KeyError:
-            exit(ERR_UNDECLVAR)
+            value = cache.function(operand1.value, operand2.value)
+        except:
+            raise InterpretError(ERR_VALUE)
+        variable = self.__findVariable(frame, destination.key)
+        variable.type, variable.value = cache.type, value
 
-def main():
+    def execCACHEDJUMP(self):
+        instruction = self.currentInstruction
+        cache = instruction.cache
+        _, symbol1, symbol2 = instruction.args
+        operand1, operand2 = self.__getSymbol(symbol1), self.__getSymbol(symbol2)
+        type1, type2 = operand1.type, operand2.type
+        if type1 != cache.type1 or type2 != cache.type2:
+            cache.misses += 1
+            self.handlers[cache.opCode]()
+            cache.type1, cache.type2 = type1, type2
+            return
+        cache.hits += 1
+        if cache.function(operand1.value, operand2.value) == True:
+            self.currentLine = instruction.target
+
+    def writeCacheReport(self):
+        '''
+        Writes hits and misses of inline caches to stderr (--ic-stats)
+        '''
+        if self.cacheReport and self.caches is not None:
+            sys.stderr.write(self.caches.report() + '\n')
+
+    def writeProfile(self):
+        '''
+        Writes profile report (--profile)
+        '''
+        if self.profiler is not None:
+            self.profiler.write(self.profileFile)
+
+    def writeSamples(self):
+        '''
+        Writes report of sampling profiler (--sample)
+        '''
+        if self.sampler is not None:
+            self.sampler.write(self.sampleFile)
+
+    def __defineMoved(self, destination, symbol):
+        '''
+        Defines variable and moves value of symbol into it (DEFVAR followed by MOVE)
+        '''
+        frame = self.__findFrame(destination.suffix)
+        if frame[destination.key] is not None: # attempt of variable redefinition
+            raise InterpretError(ERR_SEMAN)
+        frame[destination.key] = variable = Value(TYPE_VAR, None)
+        operand = self.__getSymbol(symbol)
+        variable.type, variable.value = operand.type, operand.value
+
+def execute(argv, programCache=None):
+    '''
+    Runs the interpreter with given command line arguments, programs are loaded through given cache
+    (the server keeps them in memory), returns return code
+    '''
     interpreter = Interpreter()
-    interpreter.parseArguments()
-    interpreter.executeProgram()
-    interpreter.stats.writeStats()
-    
+    interpreter.programCache = programCache
+    try:
+        interpreter.parseArguments(argv)
+        code = interpreter.run() if interpreter.batchInputs is None else interpreter.runBatch()
+    except (InterpretError, ProgramExit) as error: # source can't be loaded, invalid arguments, batch outputs can't be written or --help
+        code = error.code
+    interpreter.writeCacheReport()
+    return code
+
+def main():
+    sys.exit(execute(sys.argv[1:]))
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,83 @@
+import sys
+
+from sets import TYPE_STRING, TYPE_BOOL, TYPE_NIL
+from errorslist import ERR_INPUT, InterpretError
+
+__all__ = ['Input', 'Output', 'text']
+
+
+def text(type, value):
+    '''
+    Returns text printed by WRITE for value of given type (escape sequences of strings were decoded at load time)
+    '''
+    if type == TYPE_STRING:
+        return value
+    if type == TYPE_BOOL:
+        return 'true' if value else 'false'
+    if type == TYPE_NIL:
+        return ''
+    return str(value)
+
+
+class Output:
+    '''
+    Buffered writer of program output, pieces of text are collected and written to the stream at once
+    '''
+
+    def __init__(self, stream=None, limit=8192):
+        self.stream = stream                            # text stream (sys.stdout at the time of flush if None)
+        self.limit = limit                              # number of collected pieces that causes flush
+        self.parts = []                                 # pieces of text not written yet
+
+    def write(self, piece):
+        parts = self.parts
+        parts.append(piece)
+        if len(parts) >= self.limit:
+            self.flush()
+
+    def flush(self):
+        '''
+        Writes collected pieces to the stream, called when buffer is full, at EXIT, at program end and on error
+        '''
+        if not self.parts:
+            return
+        stream = self.stream or sys.stdout
+        stream.write(''.join(self.parts))
+        stream.flush()
+        self.parts.clear()
+
+
+class Input:
+    '''
+    Lazy reader of lines for READ, lines are read from a buffered stream one at a time,
+    so cost of READ and memory don't depend on size of input
+    '''
+
+    def __init__(self, fileName=None, bufferSize=1<<16):
+        self.owned = False                              # whether the stream was opened here (and is closed by close)
+        if fileName is None:                            # read from stdin
+            self.stream = sys.stdin
+        elif hasattr(fileName, 'readline'):             # text stream given instead of file name (library API)
+            self.stream = fileName
+        else:
+            try:
+                self.stream = open(fileName, 'r', buffering=bufferSize)
+            except OSError:
+                raise InterpretError(ERR_INPUT)
+            self.owned = True
+
+    def close(self):
+        '''
+        Closes the input file opened by this object, stdin and given streams stay open
+        '''
+        if self.owned:
+            self.stream.close()
+
+    def readLine(self):
+        '''
+        Returns next line without line terminator, None if input is exhausted
+        '''
+        line = self.stream.readline()
+        if not line:
+            return None
+        return line[:-1] if line[-1] == '\n' else line
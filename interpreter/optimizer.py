@@ -0,0 +1,145 @@
+import copy
+
+from argument import Symbol
+from instruction import originals
+from sets import *
+from value import Value
+
+__all__ = ['Optimizer']
+
+# instructions that never continue with the next line
+noFallThrough = {'JUMP', 'RETURN', 'EXIT'}
+
+
+def constantSymbol(type, value):
+    '''
+    Creates Symbol class object of constant of given type tag
+    '''
+    symbol = Symbol.__new__(Symbol)
+    symbol.type = symbol.suffix = typeNames[type]
+    symbol.value = value
+    symbol.constant = Value(type, value)
+    return symbol
+
+
+class Optimizer:
+    '''
+    Optimizer of decoded program (-O). Instructions whose operands are all constants are folded (into MOVE
+    of the result, conditional jump into JUMP, or removed if it is never taken), then control flow graph
+    is built from jumps, CALLs and fall-throughs and instructions unreachable from the first line are dropped.
+    Instruction that would fail at runtime is never folded, so the error is still reported. Optimized
+    instructions keep the original ones (parts), so statistics describe the original program
+    '''
+    def __init__(self, instructions):
+        self.instructions = instructions                    # tuple of decoded instructions
+        self.folded = 0                                     # number of folded instructions
+        self.removed = 0                                    # number of removed instructions (never taken jumps, dead code)
+        self.code = self.__optimize()                       # tuple of optimized instructions
+
+    def __optimize(self):
+        folded = [self.__fold(line) for line in range(len(self.instructions))]
+        reachable = self.__reachable(folded)
+        code, parts = [], ()
+        lines = {}                                          # dictionary of shape <original line> -> optimized line
+        for line, instruction in enumerate(folded):
+            if line not in reachable:
+                self.removed += 1
+                continue
+            if instruction is None:                         # jump that is never taken, counted along with the next line
+                parts += originals(self.instructions[line])
+                self.removed += 1
+                continue
+            if parts:
+                instruction = copy.copy(instruction)
+                instruction.parts = parts + originals(instruction)
+                parts = ()
+            lines[line] = len(code)
+            code.append(instruction)
+        for index, instruction in enumerate(code):
+            if instruction.target is not None:              # decoded program is not modified
+                instruction = code[index] = copy.copy(instruction)
+                instruction.target = lines[instruction.target]
+        return tuple(code)
+
+    def __reachable(self, folded):
+        '''
+        Returns set of lines reachable from the first line. Jump continues right after its label, label line
+        is kept (and counts as reachable) because jumps refer to it; CALL continues at the label and, after
+        RETURN, at the next line
+        '''
+        reachable, pending = set(), [0] if folded else []
+        while pending:
+            line = pending.pop()
+            if line in reachable or line >= len(folded):
+                continue
+            reachable.add(line)
+            instruction = folded[line]
+            if instruction is None:
+                pending.append(line + 1)
+                continue
+            if instruction.target is not None:
+                pending.append(instruction.target)
+            if instruction.opCode not in noFallThrough:
+                pending.append(line + 1)
+        return reachable
+
+    def __fold(self, line):
+        '''
+        Returns folded instruction of given line, the instruction itself if it can't be folded
+        or None if it is a jump that is never taken
+        '''
+        instruction = self.instructions[line]
+        opCode, args = instruction.opCode, instruction.args
+        operands = [argument for argument in args[1:] if argument is not None]
+        if not operands or any(argument.id is not None for argument in operands): # not all operands are constants
+            return instruction
+        if opCode in ('JUMPIFEQ', 'JUMPIFNEQ'):
+            result = self.__evaluate(opCode, args[1].constant, args[2].constant)
+            if result is None:
+                return instruction
+            if result[1] == True:
+                self.folded += 1
+                folded = copy.copy(instruction)
+                folded.opCode, folded.args, folded.parts = 'JUMP', (args[0], None, None), (instruction,)
+                return folded
+            # removed jump is counted along with the next line that is executed exactly when the jump is,
+            # it can't be EXIT (EXIT writes statistics before it is counted itself) or another removed jump
+            following = self.instructions[line+1] if line + 1 < len(self.instructions) else None
+            if following is None or following.opCode in ('EXIT', 'JUMPIFEQ', 'JUMPIFNEQ'):
+                return instruction
+            self.folded += 1
+            return None
+        if opCode in binaryOperators and args[2] is not None:
+            result = self.__evaluate(opCode, args[1].constant, args[2].constant)
+        elif opCode == 'STRLEN':                            # STRLEN stores its operand, just like MOVE
+            result = (args[1].constant.type, args[1].constant.value)
+        elif opCode == 'NOT':
+            constant = args[1].constant
+            result = (TYPE_BOOL, not constant.value) if constant.type == TYPE_BOOL else None
+        elif opCode == 'INT2CHAR':
+            constant = args[1].constant
+            result = (TYPE_STRING, chr(constant.value)) if constant.type == TYPE_INT and 0 <= constant.value <= 1114111 else None
+        elif opCode == 'TYPE':
+            result = (TYPE_STRING, typeNames[args[1].constant.type])
+        else:
+            result = None
+        if result is None:
+            return instruction
+        self.folded += 1
+        folded = copy.copy(instruction)
+        folded.opCode, folded.args, folded.parts = 'MOVE', (args[0], constantSymbol(*result), None), (instruction,)
+        return folded
+
+    def __evaluate(self, opCode, operand1, operand2):
+        '''
+        Returns (type, value) of expression of 2 constants, None if it fails (type check, value or string error)
+        '''
+        operator = binaryOperators[opCode]
+        if not operandTypesValid(operator, operand1.type, operand2.type):
+            return None
+        if operator == 'ORD' and (len(operand1.value) <= operand2.value or operand2.value < 0):
+            return None
+        try:
+            return typeRules[operator][0], operations[operator](operand1.value, operand2.value)
+        except Exception:
+            return None
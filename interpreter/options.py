@@ -0,0 +1,57 @@
+from errorslist import ERR_PARAM, InterpretError
+
+__all__ = ['getOptions']
+
+
+def getOptions(argv, shortOptions, longOptions):
+    '''
+    Parses command line options the same way as getopt.getopt (long option may be abbreviated to a unique
+    prefix, parsing stops at the first argument that is not an option), returns list of (option, argument).
+    Unknown or ambiguous option and missing or unexpected argument raise InterpretError(ERR_PARAM).
+    The getopt module is not used, it imports gettext and re on every start of the interpreter
+    '''
+    opts, args = [], list(argv)
+    while args and args[0].startswith('-') and args[0] != '-':
+        arg = args.pop(0)
+        if arg == '--':
+            break
+        if arg.startswith('--'):
+            name, separator, value = arg[2:].partition('=')
+            hasArgument, name = longOption(name, longOptions)
+            if hasArgument and not separator:
+                if not args:
+                    raise InterpretError(ERR_PARAM)
+                value = args.pop(0)
+            elif separator and not hasArgument:
+                raise InterpretError(ERR_PARAM)
+            opts.append(('--' + name, value))
+            continue
+        letters = arg[1:]
+        while letters:
+            letter, letters = letters[0], letters[1:]
+            index = shortOptions.find(letter)
+            if index < 0 or letter == ':':
+                raise InterpretError(ERR_PARAM)
+            value = ''
+            if shortOptions.startswith(':', index + 1):  # the rest of the argument or the next one is the value
+                if not letters:
+                    if not args:
+                        raise InterpretError(ERR_PARAM)
+                    letters = args.pop(0)
+                value, letters = letters, ''
+            opts.append(('-' + letter, value))
+    return opts
+
+
+def longOption(name, longOptions):
+    '''
+    Returns (whether option takes an argument, full name) of given (possibly abbreviated) long option
+    '''
+    candidates = [option for option in longOptions if option.startswith(name)]
+    if name in candidates:
+        return False, name
+    if name + '=' in candidates:
+        return True, name
+    if len(candidates) != 1:                            # unknown or ambiguous abbreviation
+        raise InterpretError(ERR_PARAM)
+    return candidates[0].endswith('='), candidates[0].rstrip('=')
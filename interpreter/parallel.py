@@ -0,0 +1,49 @@
+import multiprocessing
+
+from cache import dumpProgram, restoreProgram
+
+__all__ = ['ParallelBatch']
+
+# attributes of Interpreter class object copied to the interpreters of worker processes
+settings = ('engine', 'peephole', 'optimize', 'inlineCaches', 'batchOutput', 'batchStats')
+
+worker = None                                               # Interpreter class object of the worker process
+
+
+def initWorker(cls, options, countVars, data):
+    '''
+    Creates interpreter of the worker process with given options and the program restored from marshal format,
+    the program is prepared for execution by the first run and the following runs reuse it
+    '''
+    global worker
+    worker = cls()
+    for name, value in options.items():
+        setattr(worker, name, value)
+    worker.stats.countVars = countVars
+    worker.program = restoreProgram(data)
+
+
+def runCase(inputFile):
+    return worker.runCase(inputFile)
+
+
+class ParallelBatch:
+    '''
+    Batch mode on a pool of worker processes: input files are sharded in chunks across the workers,
+    the loaded program is shipped to each worker once (in the marshal format of the program cache),
+    results of shape (input file, return code, seconds) are collected in order of the input files
+    '''
+    def __init__(self, vm, jobs):
+        self.vm = vm                                        # Interpreter class object with loaded program
+        self.jobs = jobs                                    # number of worker processes
+
+    def run(self):
+        '''
+        Generator of results of all input files of the batch
+        '''
+        vm = self.vm
+        options = {name : getattr(vm, name) for name in settings}
+        initArgs = (type(vm), options, vm.stats.countVars, dumpProgram(vm.program))
+        chunk = max(1, len(vm.batchInputs) // (self.jobs * 4)) # a few chunks per worker keep the load balanced
+        with multiprocessing.Pool(self.jobs, initWorker, initArgs) as pool:
+            yield from pool.imap(runCase, vm.batchInputs, chunk)
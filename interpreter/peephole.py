@@ -0,0 +1,166 @@
+import copy
+
+from instruction import originals
+from sets import binaryOperators, operations
+
+__all__ = ['Peephole', 'Superinstruction', 'superinstructionSet']
+
+# opcodes of superinstructions (each has its "exec*X*" handler in Interpreter class)
+superinstructionSet = ('STACKEXPR', 'CALLWITHARGS', 'COMPAREJUMP', 'DEFMOVE', 'PUSHPOPS', 'RETURNFRAME')
+# binary stack instructions fused with PUSHS of both operands and POPS of the result
+stackOperations = {'ADDS', 'SUBS', 'MULS', 'DIVS', 'IDIVS', 'LTS', 'GTS', 'EQS', 'ANDS', 'ORS'}
+# comparisons fused with following conditional jump
+comparisons = {'EQ', 'LT', 'GT'}
+
+
+class Superinstruction:
+    '''
+    Sequence of instructions executed by a single handler. Parts are the original (decoded) instructions,
+    they are used for statistics, so the program is reported as if it was not optimized
+    '''
+    args = ()                                       # arguments used by the handler
+    target = None                                   # line of label (if the last part is a jump or CALL)
+    operation = None                                # opcode of fused stack instruction or comparison
+    function = None                                 # expression of fused comparison
+    operator = None                                 # operator of type rule of fused comparison
+    condition = None                                # result of fused comparison that causes the jump
+    pairs = ()                                      # (variable, symbol) arguments of fused DEFVAR and MOVE pairs
+    checked = True                                  # False if operand types are proven (see TypeInference)
+
+    def __init__(self, opCode, parts):
+        self.opCode = opCode
+        self.size = len(parts)                              # number of replaced lines
+        self.parts = tuple(original for part in parts for original in originals(part))
+        self.order = parts[0].order
+        self.target = parts[-1].target
+
+    def __str__(self):
+        return f'{self.order}: {self.opCode} ' + ' | '.join(part.opCode for part in self.parts)
+
+
+class Peephole:
+    '''
+    Peephole optimizer, replaces sequences of instructions typical for generated code by superinstructions.
+    No sequence contains LABEL and jump or CALL is always its last part, so jumps and returns never lead
+    into a superinstruction; jump targets are moved to lines of the optimized code
+    '''
+    def __init__(self, instructions):
+        self.instructions = instructions                    # tuple of decoded instructions
+        self.code = self.__fuse()                           # tuple of instructions and superinstructions
+
+    def __fuse(self):
+        instructions, code = self.instructions, []
+        lines = [0] * len(instructions)                     # list of shape [original line] -> optimized line
+        matchers = (self.__matchStackExpression, self.__matchCall, self.__matchCompareJump,
+            self.__matchDefineMove, self.__matchPushPop, self.__matchReturn)
+        line = 0
+        while line < len(instructions):
+            lines[line] = len(code)
+            for matcher in matchers:
+                fused = matcher(line)
+                if fused is not None:
+                    code.append(fused)
+                    line += fused.size
+                    break
+            else:
+                code.append(instructions[line])
+                line += 1
+        for index, instruction in enumerate(code):
+            if instruction.target is not None:
+                if type(instruction) is not Superinstruction: # decoded program is not modified
+                    instruction = code[index] = copy.copy(instruction)
+                instruction.target = lines[instruction.target]
+        return tuple(code)
+
+    def __opCodes(self, line, count):
+        return tuple(instruction.opCode for instruction in self.instructions[line:line+count])
+
+    def __sameVariable(self, variable, symbol):
+        return symbol.id is not None and symbol.suffix == variable.suffix and symbol.id == variable.id
+
+    def __matchStackExpression(self, line):
+        '''
+        PUSHS <symb1>, PUSHS <symb2>, <binary stack instruction>, POPS <var>
+        '''
+        opCodes = self.__opCodes(line, 4)
+        if len(opCodes) < 4 or opCodes[:2] != ('PUSHS', 'PUSHS') or opCodes[2] not in stackOperations or opCodes[3] != 'POPS':
+            return None
+        parts = self.instructions[line:line+4]
+        fused = Superinstruction('STACKEXPR', parts)
+        fused.args = (parts[3].args[0], parts[0].args[0], parts[1].args[0])
+        fused.operation = opCodes[2]
+        return fused
+
+    def __matchCall(self, line):
+        '''
+        CREATEFRAME, (DEFVAR TF@<name>, MOVE TF@<name> <symb>)*, CALL <label>
+        '''
+        instructions = self.instructions
+        if instructions[line].opCode != 'CREATEFRAME':
+            return None
+        end, pairs = line + 1, []
+        while self.__opCodes(end, 2) == ('DEFVAR', 'MOVE') and instructions[end].args[0].suffix == 'TF' \
+        and self.__sameVariable(instructions[end].args[0], instructions[end+1].args[0]):
+            pairs.append((instructions[end].args[0], instructions[end+1].args[1]))
+            end += 2
+        if end == len(instructions) or instructions[end].opCode != 'CALL':
+            return None
+        fused = Superinstruction('CALLWITHARGS', instructions[line:end+1])
+        fused.pairs = tuple(pairs)
+        return fused
+
+    def __matchCompareJump(self, line):
+        '''
+        EQ|LT|GT <var> <symb1> <symb2>, JUMPIFEQ|JUMPIFNEQ <label> <var> bool@<value> (or bool@<value> <var>)
+        '''
+        opCodes = self.__opCodes(line, 2)
+        if len(opCodes) < 2 or opCodes[0] not in comparisons or opCodes[1] not in ('JUMPIFEQ', 'JUMPIFNEQ'):
+            return None
+        compare, jump = self.instructions[line:line+2]
+        variable, (_, symbol1, symbol2) = compare.args[0], jump.args
+        if self.__sameVariable(variable, symbol1) and symbol2.type == 'bool':
+            constant = symbol2.value
+        elif self.__sameVariable(variable, symbol2) and symbol1.type == 'bool':
+            constant = symbol1.value
+        else:
+            return None
+        fused = Superinstruction('COMPAREJUMP', (compare, jump))
+        fused.args = compare.args
+        fused.operation = compare.opCode
+        fused.operator = binaryOperators[compare.opCode]
+        fused.function = operations[fused.operator]
+        fused.condition = constant if jump.opCode == 'JUMPIFEQ' else not constant
+        fused.checked = compare.checked
+        return fused
+
+    def __matchDefineMove(self, line):
+        '''
+        DEFVAR <var>, MOVE <var> <symb>
+        '''
+        if self.__opCodes(line, 2) != ('DEFVAR', 'MOVE'):
+            return None
+        define, move = self.instructions[line:line+2]
+        if not self.__sameVariable(define.args[0], move.args[0]):
+            return None
+        fused = Superinstruction('DEFMOVE', (define, move))
+        fused.args = move.args[:2]
+        return fused
+
+    def __matchPushPop(self, line):
+        '''
+        PUSHS <symb>, POPS <var>
+        '''
+        if self.__opCodes(line, 2) != ('PUSHS', 'POPS'):
+            return None
+        push, pop = self.instructions[line:line+2]
+        fused = Superinstruction('PUSHPOPS', (push, pop))
+        fused.args = (pop.args[0], push.args[0])
+        return fused
+
+    def __matchReturn(self, line):
+        '''
+        POPFRAME, RETURN
+        '''
+        if self.__opCodes(line, 2) != ('POPFRAME', 'RETURN'):
+            return None
+        return Superinstruction('RETURNFRAME', self.instructions[line:line+2])
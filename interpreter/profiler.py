@@ -0,0 +1,170 @@
+import signal
+
+__all__ = ['Profiler', 'Sampler', 'MAIN', 'samplingSupported']
+
+MAIN = '<main>'                                             # name of the function the program starts in
+samplingSupported = hasattr(signal, 'setitimer')            # CPU time timer is available on Unix only
+
+
+class Profiler:
+    '''
+    Profile of instructions (execution count and cumulative wall time of each line of the program) and of
+    functions (CALL target labels: number of calls, inclusive and exclusive time). Times are in nanoseconds.
+    Exclusive time of each call stack is collected as well and written in the folded format of flame graph
+    tools (labels separated by semicolons followed by a number of microseconds)
+    '''
+    def __init__(self, program):
+        self.program = program.instructions                 # profiled (decoded) instructions
+        self.names = {line : label for label, line in program.labels.items()} # dictionary of shape <line> -> label
+        self.counts = [0] * len(self.program)               # list of shape [line] -> number of executions
+        self.times = [0] * len(self.program)                # list of shape [line] -> cumulative time
+        self.functions = {}                                 # dictionary of shape <label> -> [calls, inclusive, exclusive]
+        self.stacks = {}                                    # dictionary of shape <tuple of labels> -> exclusive time
+        self.frames = []                                    # active calls, list of [label, start time, time of callees]
+        self.active = {}                                    # dictionary of shape <label> -> number of active calls
+        self.total = 0                                      # time from the start to the end of the program
+
+    def start(self, now):
+        self.total = -now
+        self.enter(MAIN, now)
+
+    def enter(self, label, now):
+        '''
+        Called right after CALL of given label (or at the start of the program)
+        '''
+        self.frames.append([label, now, 0])
+        self.active[label] = self.active.get(label, 0) + 1
+        function = self.functions.setdefault(label, [0, 0, 0])
+        function[0] += 1
+
+    def leave(self, now):
+        '''
+        Called right after RETURN (or at the end of the program for all active calls)
+        '''
+        path = tuple(frame[0] for frame in self.frames)
+        label, start, callees = self.frames.pop()
+        inclusive = now - start
+        function = self.functions[label]
+        self.active[label] -= 1
+        if not self.active[label]:                          # recursive calls are included in the outermost one
+            function[1] += inclusive
+        function[2] += inclusive - callees
+        self.stacks[path] = self.stacks.get(path, 0) + inclusive - callees
+        if self.frames:
+            self.frames[-1][2] += inclusive
+
+    def finish(self, now):
+        while self.frames:
+            self.leave(now)
+        self.total += now
+
+    def report(self):
+        '''
+        Returns text report: instructions and functions sorted by time
+        '''
+        executed = sum(self.counts)
+        lines = [f'Profile: {executed} instructions executed in {self.total/1e6:.3f} ms', '',
+            f'{"order":>8} {"opcode":<12} {"count":>10} {"time ms":>10} {"%":>6} {"ns/exec":>8}']
+        total = max(self.total, 1)
+        for line in sorted(range(len(self.program)), key=lambda line: self.times[line], reverse=True):
+            count, time = self.counts[line], self.times[line]
+            if count:
+                instruction = self.program[line]
+                lines.append(f'{instruction.order:>8} {instruction.opCode:<12} {count:>10} {time/1e6:>10.3f} ' \
+                    f'{100*time/total:>6.2f} {time//count:>8}')
+        lines += ['', f'{"function":<24} {"calls":>8} {"inclusive ms":>12} {"exclusive ms":>12} {"%":>6}']
+        for label, (calls, inclusive, exclusive) in sorted(self.functions.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append(f'{label:<24} {calls:>8} {inclusive/1e6:>12.3f} {exclusive/1e6:>12.3f} {100*inclusive/total:>6.2f}')
+        return '\n'.join(lines) + '\n'
+
+    def folded(self):
+        '''
+        Returns exclusive time (microseconds) of call stacks in folded format of flame graph tools
+        '''
+        return ''.join(f'{";".join(path)} {time//1000}\n' for path, time in self.stacks.items() if time >= 1000)
+
+    def write(self, fileName):
+        '''
+        Writes text report into given file and folded call stacks into the file with ".folded" suffix
+        '''
+        with open(fileName, 'w') as file:
+            file.write(self.report())
+        with open(fileName + '.folded', 'w') as file:
+            file.write(self.folded())
+
+
+class Sampler:
+    '''
+    Sampling profiler: CPU time interval timer (SIGPROF) interrupts the execution loop and the handler records
+    order of the current instruction and the stack of functions (CALL target labels of lines in callStack).
+    Nothing is done per instruction, so the overhead depends only on the interval
+    '''
+    def __init__(self, vm, interval):
+        self.vm = vm                                        # sampled Interpreter class object
+        self.interval = interval                            # seconds of CPU time between samples
+        code = vm.code
+        # functions called by lines of shape <line of CALL> -> label (return addresses in callStack are these lines)
+        self.labels = {line : code[instruction.target].args[0].value for line, instruction in enumerate(code)
+            if instruction.opCode in ('CALL', 'CALLWITHARGS')}
+        self.opCodes = {instruction.order : instruction.opCode for instruction in vm.program.instructions}
+        self.orders = {}                                    # dictionary of shape <order> -> number of samples
+        self.stacks = {}                                    # dictionary of shape <tuple of labels> -> number of samples
+        self.samples = 0
+
+    def start(self):
+        signal.signal(signal.SIGPROF, self.__sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    def __sample(self, signalNumber, frame):
+        instruction = self.vm.currentInstruction
+        if instruction is None:                             # execution has not started yet
+            return
+        self.samples += 1
+        self.orders[instruction.order] = self.orders.get(instruction.order, 0) + 1
+        path = (MAIN, *(self.labels.get(line, '?') for line in self.vm.callStack))
+        self.stacks[path] = self.stacks.get(path, 0) + 1
+
+    def report(self):
+        '''
+        Returns text report: instructions by number of samples and call tree of functions
+        (inclusive and own samples of each call path)
+        '''
+        total = max(self.samples, 1)
+        lines = [f'Samples: {self.samples} (every {self.interval*1000:g} ms of CPU time)', '',
+            f'{"order":>8} {"opcode":<12} {"samples":>8} {"%":>6}']
+        for order, samples in sorted(self.orders.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f'{order:>8} {self.opCodes.get(order, "?"):<12} {samples:>8} {100*samples/total:>6.2f}')
+        inclusive = {}                                      # dictionary of shape <tuple of labels> -> samples
+        for path, samples in self.stacks.items():
+            for depth in range(1, len(path) + 1):
+                inclusive[path[:depth]] = inclusive.get(path[:depth], 0) + samples
+        lines += ['', f'{"samples":>8} {"%":>6} {"self":>8}  call tree']
+        children = {}                                       # dictionary of shape <path> -> list of longer paths by one label
+        for path in inclusive:
+            children.setdefault(path[:-1], []).append(path)
+        pending = sorted(children.get((), []), key=inclusive.get)
+        while pending:
+            path = pending.pop()
+            lines.append(f'{inclusive[path]:>8} {100*inclusive[path]/total:>6.2f} {self.stacks.get(path, 0):>8}  ' \
+                + '  ' * (len(path) - 1) + path[-1])
+            pending += sorted(children.get(path, []), key=inclusive.get)
+        return '\n'.join(lines) + '\n'
+
+    def folded(self):
+        '''
+        Returns number of samples of call stacks in folded format of flame graph tools
+        '''
+        return ''.join(f'{";".join(path)} {samples}\n' for path, samples in self.stacks.items())
+
+    def write(self, fileName):
+        '''
+        Writes text report into given file and folded call stacks into the file with ".folded" suffix
+        '''
+        with open(fileName, 'w') as file:
+            file.write(self.report())
+        with open(fileName + '.folded', 'w') as file:
+            file.write(self.folded())
@@ -0,0 +1,161 @@
+from errorslist import *
+
+MAX_LOCAL_SLOTS = 64                                        # max number of distinct local variable names for array-backed local frames
+# instructions with label argument that transfer control to it
+jumpInstructions = {'CALL', 'JUMP', 'JUMPIFEQ', 'JUMPIFNEQ', 'JUMPIFEQS', 'JUMPIFNEQS'}
+
+
+def frameSize(frame):
+    '''
+    Returns number of variables defined in given frame
+    '''
+    return len(frame) - frame.count(None) if type(frame) is list else len(frame)
+
+
+class DynamicFrame(dict):
+    '''
+    Frame of shape <varID> -> Value class object (runtime value cell), used for local and temporary frames of programs
+    with too many local variable names. Undefined variable is None, just like an empty slot of array-backed frame
+    '''
+    def __missing__(self, key):
+        return None
+
+
+class Program:
+    '''
+    Pre-decoded representation of input code. XML is parsed incrementally and each instruction element
+    is decoded as soon as it is complete and discarded right away, so the XML tree is never built as a whole,
+    execution loop then only indexes the instruction array
+    '''
+    def __init__(self, source, factory):
+        '''
+        Loads program from given XML file (path or file object), checks orders, finds all labels
+        and resolves targets of jumps (undefined label is an error even if the jump is never executed)
+        '''
+        decoded = self.__decode(source, factory)            # list of (order, Instruction class object or InterpretError)
+        decoded.sort(key=lambda item: item[0])              # stable, so equal orders keep document order
+        instructions = []                                   # list of Instruction class objects
+        orders = set()                                      # set of orders (no duplicates, all should be positive)
+        labels = {}                                         # dictionary of labels <labelName> -> line
+        for line, (_, instruction) in enumerate(decoded):
+            if isinstance(instruction, InterpretError):     # instruction could not be decoded
+                raise instruction
+            if instruction.order in orders or instruction.order < 1:
+                raise InterpretError(ERR_STRUCT)
+            orders.add(instruction.order)
+            if instruction.opCode == 'LABEL':
+                if instruction.args[0].value in labels:
+                    raise InterpretError(ERR_SEMAN)
+                labels[instruction.args[0].value] = line
+            instructions.append(instruction)
+        for instruction in instructions:
+            if instruction.opCode in jumpInstructions:
+                if instruction.args[0].value not in labels:
+                    raise InterpretError(ERR_SEMAN)
+                instruction.target = labels[instruction.args[0].value]
+
+        self.instructions = tuple(instructions)             # immutable array of decoded instructions
+        self.labels = labels
+        self.globalNames = []                               # list of global variables' names, index is slot number
+        self.localNames = []                                # list of local and temporary variables' names, index is slot number
+        self.dynamicFrames = False                          # whether local frames are DynamicFrame objects instead of lists
+        self.__resolveVariables()
+
+    @classmethod
+    def restore(cls, instructions, labels, globalNames, localNames, dynamicFrames):
+        '''
+        Creates program from parts of already loaded and validated program (see ProgramCache)
+        '''
+        program = cls.__new__(cls)
+        program.instructions = instructions
+        program.labels = labels
+        program.globalNames = globalNames
+        program.localNames = localNames
+        program.dynamicFrames = dynamicFrames
+        return program
+
+    def __decode(self, source, factory):
+        '''
+        Parses XML incrementally, decodes each instruction (child of the root element) as soon as its end tag
+        is read and frees the element. Errors are reported in the same order as if the whole document was parsed
+        and sorted first: malformed XML, invalid root, invalid order, then errors of instructions by their order
+        '''
+        import xml.etree.ElementTree as ET                  # programs restored from cache don't need the XML parser
+        decoded = []                                        # list of (order, Instruction class object or InterpretError)
+        root, depth, error = None, 0, None
+        try:
+            for event, element in ET.iterparse(source, events=('start', 'end')):
+                if event == 'start':
+                    if root is None:
+                        root = element
+                        if root.tag != 'program' or root.get('language') != 'IPPcode22':
+                            error = InterpretError(ERR_STRUCT)
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth != 1:                              # arguments are decoded along with their instruction
+                    continue
+                if error is None:
+                    try:
+                        order = int(element.get('order'))
+                    except (TypeError, ValueError):
+                        error = InterpretError(ERR_STRUCT)
+                        continue
+                    try:
+                        decoded.append((order, factory.createInstruction(element)))
+                    except InterpretError as decodingError: # reported once all preceding instructions are checked
+                        decoded.append((order, decodingError))
+                root.clear()                                # XML element is not needed anymore
+        except ET.ParseError:
+            raise InterpretError(ERR_FORMAT)
+        except OSError:                                     # source file can't be opened or read
+            raise InterpretError(ERR_INPUT)
+        if error is not None:
+            raise error
+        return decoded
+
+    def __resolveVariables(self):
+        '''
+        Assigns each variable a slot number in its frame. Local and temporary frames share numbering
+        (temporary frame becomes local), if there are too many local names, they are looked up by name instead
+        '''
+        globalSlots, localSlots = {}, {}
+        for instruction in self.instructions:
+            for argument in instruction.args:
+                if argument is None or argument.id is None:
+                    continue
+                slots = globalSlots if argument.suffix == 'GF' else localSlots
+                argument.key = slots.setdefault(argument.id, len(slots))
+        self.globalNames, self.localNames = list(globalSlots), list(localSlots)
+        self.dynamicFrames = len(localSlots) > MAX_LOCAL_SLOTS
+        if self.dynamicFrames:
+            for instruction in self.instructions:
+                for argument in instruction.args:
+                    if argument is not None and argument.suffix in ('LF', 'TF'):
+                        argument.key = argument.id
+
+    def createGlobalFrame(self):
+        return [None] * len(self.globalNames)
+
+    def createFrame(self):
+        '''
+        Creates empty local (or temporary) frame
+        '''
+        return DynamicFrame() if self.dynamicFrames else [None] * len(self.localNames)
+
+    def frameContents(self, frame, names):
+        '''
+        Returns dictionary of shape <varID> -> variable for given frame (for debug output),
+        names is the list of slot names of the frame (globalNames or localNames)
+        '''
+        if frame is None:
+            return None
+        if type(frame) is not list:
+            return {key : str(variable) for key, variable in frame.items()}
+        return {names[slot] : str(variable) for slot, variable in enumerate(frame) if variable is not None}
+
+    def __len__(self):
+        return len(self.instructions)
+
+    def __getitem__(self, line):
+        return self.instructions[line]
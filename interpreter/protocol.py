@@ -0,0 +1,46 @@
+import marshal
+import os
+import struct
+
+__all__ = ['SOCKET_VARIABLE', 'defaultSocket', 'sendMessage', 'receiveMessage']
+
+SOCKET_VARIABLE = 'IPP_INTERPRET_SOCKET'                    # environment variable with path of the server socket
+HEADER = struct.Struct('>I')                                # length of message in bytes, followed by the message in marshal format
+
+
+def defaultSocket():
+    '''
+    Returns path of the server socket: given by environment variable or per-user default in temporary directory
+    '''
+    return os.environ.get(SOCKET_VARIABLE) or \
+        os.path.join(os.environ.get('TMPDIR', '/tmp'), f'ipp-interpret-{os.getuid()}.sock')
+
+
+def sendMessage(connection, message):
+    '''
+    Sends dictionary as one message
+    '''
+    data = marshal.dumps(message)
+    connection.sendall(HEADER.pack(len(data)) + data)
+
+
+def receiveMessage(connection):
+    '''
+    Returns dictionary of one received message, None if the connection was closed before it was complete
+    '''
+    header = receiveBytes(connection, HEADER.size)
+    if header is None:
+        return None
+    data = receiveBytes(connection, HEADER.unpack(header)[0])
+    return None if data is None else marshal.loads(data)
+
+
+def receiveBytes(connection, size):
+    parts = []
+    while size:
+        part = connection.recv(min(size, 1 << 20))
+        if not part:
+            return None
+        parts.append(part)
+        size -= len(part)
+    return b''.join(parts)
@@ -0,0 +1,112 @@
+import contextlib
+import getopt
+import io
+import os
+import signal
+import socket
+import sys
+import traceback
+
+from cache import ProgramMemoryCache
+from errorslist import ERR_INTERNAL
+from interpret import execute
+from protocol import defaultSocket, sendMessage, receiveMessage
+
+__all__ = ['InterpreterServer']
+
+usage = "Usage: server.py [--socket=PATH] [--cache-size=N]\n\n" \
+    "Interpreter server: executes requests of client.py (same options as interpret.py) in a warm process\n\t" \
+    "--socket=PATH Unix socket the server listens on (default $IPP_INTERPRET_SOCKET or ipp-interpret-UID.sock in $TMPDIR)\n\t" \
+    "--cache-size=N maximum number of loaded programs kept in memory (default 64)"
+
+
+class InterpreterServer:
+    '''
+    Persistent interpreter listening on a Unix socket: modules are imported and loaded programs are cached
+    (in-memory LRU keyed by hash of source) once, so each request costs only loading of a new program
+    and execution. Request carries command line arguments and working directory of the client, whose standard input
+    is passed as a file descriptor (read only if the program needs it), response carries stdout, stderr and return code. Requests are executed one at a time in the server process
+    '''
+    def __init__(self, path, cacheSize=64):
+        self.path = path                                    # path of the socket
+        self.programs = ProgramMemoryCache(cacheSize)       # loaded programs shared by requests
+
+    def serve(self):
+        '''
+        Accepts and executes requests until the server is terminated (SIGTERM or SIGINT)
+        '''
+        if os.path.exists(self.path):                       # socket left by a server that did not end cleanly
+            os.remove(self.path)
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(self.path)
+            listener.listen()
+            while True:
+                connection, _ = listener.accept()
+                with connection:
+                    self.__serveConnection(connection)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            listener.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def __serveConnection(self, connection):
+        '''
+        Receives, executes and answers one request, client that disconnects or sends an invalid message
+        ends only its own connection
+        '''
+        try:
+            _, fds, _, _ = socket.recv_fds(connection, 1, 1)
+            if not fds:
+                return
+            with open(fds[0], closefd=True) as stdin:
+                request = receiveMessage(connection)
+                if request is not None:
+                    sendMessage(connection, self.execute(request, stdin))
+        except (OSError, ValueError, EOFError, TypeError): # broken connection or message that is not in marshal format
+            pass
+
+    def execute(self, request, stdin):
+        '''
+        Executes one request like interpret.py would in working directory of the client,
+        with standard input of the client (received file descriptor), returns response
+        '''
+        stdout, stderr = io.StringIO(), io.StringIO()
+        savedStdin, savedDirectory = sys.stdin, os.getcwd()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                sys.stdin = stdin
+                os.chdir(request['cwd'])
+                code = execute(request['argv'], self.programs)
+            except Exception:                               # failure of the interpreter, traceback goes to the client
+                traceback.print_exc()
+                code = ERR_INTERNAL
+            finally:
+                sys.stdin = savedStdin
+                os.chdir(savedDirectory)
+        return {'stdout' : stdout.getvalue(), 'stderr' : stderr.getvalue(), 'code' : code}
+
+
+def main():
+    path, cacheSize = defaultSocket(), 64
+    try:
+        opts, _ = getopt.getopt(sys.argv[1:], '', ['help', 'socket=', 'cache-size='])
+        for opt, arg in opts:
+            if opt == '--help':
+                print(usage)
+                return
+            elif opt == '--socket':
+                path = arg
+            elif opt == '--cache-size':
+                cacheSize = int(arg)
+                if cacheSize < 1:
+                    raise ValueError
+    except (getopt.GetoptError, ValueError):
+        sys.exit(usage)
+    InterpreterServer(path, cacheSize).serve()
+
+if __name__ == "__main__":
+    main()
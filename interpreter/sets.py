@@ -1,4 +1,64 @@
-__all__ = ['instructionSet', 'help']
+__all__ = ['instructionSet', 'help', 'typeTags', 'typeNames', 'typeRules', 'SAME', 'SAME_OR_NIL',
+    'operations', 'binaryOperators', 'operandTypesValid', 'TYPE_VAR', 'TYPE_NIL', 'TYPE_INT', 'TYPE_BOOL', 'TYPE_STRING']
+
+# data type tags of runtime values (TYPE_VAR - variable is not initialized yet)
+TYPE_VAR, TYPE_NIL, TYPE_INT, TYPE_BOOL, TYPE_STRING = range(5)
+typeTags = {'var' : TYPE_VAR, 'nil' : TYPE_NIL, 'int' : TYPE_INT, 'bool' : TYPE_BOOL, 'string' : TYPE_STRING}
+typeNames = ('var', 'nil', 'int', 'bool', 'string')      # type name of shape [tag] -> name
+
+# type rules of expressions of shape <operator> -> (result type, operand 1 type, operand 2 type)
+# operand type is either a tag, SAME (operands of the same type other than nil)
+# or SAME_OR_NIL (operands of the same type, or one of them is nil)
+SAME, SAME_OR_NIL = -1, -2
+typeRules = {
+    '+' : (TYPE_INT, TYPE_INT, TYPE_INT),
+    '-' : (TYPE_INT, TYPE_INT, TYPE_INT),
+    '*' : (TYPE_INT, TYPE_INT, TYPE_INT),
+    '/' : (TYPE_INT, TYPE_INT, TYPE_INT),
+    '//' : (TYPE_INT, TYPE_INT, TYPE_INT),
+    '<' : (TYPE_BOOL, SAME, SAME),
+    '>' : (TYPE_BOOL, SAME, SAME),
+    '==' : (TYPE_BOOL, SAME_OR_NIL, SAME_OR_NIL),
+    '!=' : (TYPE_BOOL, SAME_OR_NIL, SAME_OR_NIL),
+    '&&' : (TYPE_BOOL, TYPE_BOOL, TYPE_BOOL),
+    '||' : (TYPE_BOOL, TYPE_BOOL, TYPE_BOOL),
+    '..' : (TYPE_STRING, TYPE_STRING, TYPE_STRING),
+    'GC' : (TYPE_STRING, TYPE_STRING, TYPE_INT),
+    'ORD' : (TYPE_INT, TYPE_STRING, TYPE_INT)}
+# expressions of operators of shape <operator> -> function of operands' values (types are checked before)
+operations = {
+    '+' : lambda a, b : a + b,
+    '-' : lambda a, b : a - b,
+    '*' : lambda a, b : a * b,
+    '/' : lambda a, b : a / b,
+    '//' : lambda a, b : a // b,
+    '<' : lambda a, b : a < b,
+    '>' : lambda a, b : a > b,
+    '==' : lambda a, b : a == b,
+    '!=' : lambda a, b : a != b,
+    '&&' : lambda a, b : a and b,
+    '||' : lambda a, b : a or b,
+    '..' : lambda a, b : a + b,
+    'GC' : lambda a, b : a[int(b)],
+    'ORD' : lambda a, b : ord(a[b])}
+# instructions evaluating expression of 2 symbols of shape <opCode> -> operator of type rule
+binaryOperators = {
+    'ADD' : '+', 'SUB' : '-', 'MUL' : '*', 'IDIV' : '//', 'LT' : '<', 'GT' : '>', 'EQ' : '==',
+    'AND' : '&&', 'OR' : '||', 'STRI2INT' : 'ORD', 'CONCAT' : '..', 'GETCHAR' : 'GC',
+    'JUMPIFEQ' : '==', 'JUMPIFNEQ' : '!='}
+
+
+def operandTypesValid(operator, type1, type2):
+    '''
+    Returns whether operands of given type tags pass type rule of operator
+    '''
+    _, rule1, rule2 = typeRules[operator]
+    if rule1 == SAME:
+        return type1 == type2 and type1 != TYPE_NIL
+    if rule1 == SAME_OR_NIL:
+        return type1 == type2 or type1 == TYPE_NIL or type2 == TYPE_NIL
+    return type1 == rule1 and type2 == rule2
+
 
 instructionSet = {
     'CREATEFRAME' : [],
@@ -7,6 +67,19 @@ instructionSet = {
     'RETURN' : [],
     'BREAK' : [],
     'CLEARS' : [],
+    'NOTS' : [],
+    'INT2CHARS' : [],
+    'STRI2INTS' : [],
+    'ADDS' : [],
+    'SUBS' : [],
+    'MULS' : [],
+    'DIVS' : [],
+    'IDIVS' : [],
+    'LTS' : [],
+    'GTS' : [],
+    'EQS' : [],
+    'ANDS' : [],
+    'ORS' : [],
     'CALL' : ['Label'],
     'LABEL' : ['Label'],
     'JUMP' : ['Label'],
@@ -20,19 +93,6 @@ instructionSet = {
     'WRITE' : ['Symbol'],
     'EXIT' : ['Symbol'],
     'DPRINT' : ['Symbol'],
-    'NOTS' : ['Symbol'],
-    'INT2CHARS' : ['Symbol'],
-    'STRI2INTS' : ['Symbol'],
-    'ADDS' : ['Symbol', 'Symbol'],
-    'SUBS' : ['Symbol', 'Symbol'],
-    'MULS' : ['Symbol', 'Symbol'],
-    'DIVS' : ['Symbol', 'Symbol'],
-    'IDIVS' : ['Symbol', 'Symbol'],
-    'LTS' : ['Symbol', 'Symbol'],
-    'GTS' : ['Symbol', 'Symbol'],
-    'EQS' : ['Symbol', 'Symbol'],
-    'ANDS' : ['Symbol', 'Symbol'],
-    'ORS' : ['Symbol', 'Symbol'],
     'MOVE' : ['Variable', 'Symbol'],
     'INT2CHAR' : ['Variable', 'Symbol'],
     'STRLEN' : ['Variable', 'Symbol'],
@@ -53,7 +113,23 @@ instructionSet = {
     'SETCHAR' : ['Variable', 'Symbol', 'Symbol'],
     'READ' : ['Variable', 'Type']}
 
-help = "Usage: interpret.py [--source=SOURCE_FILE] [--input=INPUT_FILE] [--stats=STATS_FILE] [--insts] [--hot] [--vars]\n\n" \
+help = "Usage: interpret.py [--source=SOURCE_FILE] [--input=INPUT_FILE] [--engine=ENGINE] [--cache-dir=DIR] [--no-peephole] [--no-inline-caches] [--ic-stats] [--profile=PROFILE_FILE] [--sample=SAMPLE_FILE] [--sample-interval=MS] [--batch=INPUTS] [--batch-output=DIR] [--jobs=N] [-O] [--stats=STATS_FILE] [--insts] [--hot] [--vars] [--stats-json=JSON_FILE]\n\n" \
     "Arguments:\n\t--help shows help message and exits\n\t--source=SOURCE_FILE indicates source file\n\t--input=INPUT_FILE indicates input file\n\t" \
+    "--engine=ENGINE execution engine, either 'interpreted' (default) or 'compiled' (program is translated into Python functions)\n\t" \
+    "--cache-dir=DIR directory of loaded programs cache, a program is stored there once and then loaded without parsing XML\n\t" \
+    "-O constant operands are folded and unreachable code is dropped before execution\n\t" \
+    "--no-peephole interpreted program is executed without superinstructions (fused sequences of instructions)\n\t" \
+    "--no-inline-caches interpreted program is executed without inline caches of operand types\n\t" \
+    "--ic-stats hits and misses of inline caches are written to stderr after execution\n\t" \
+    "--profile=PROFILE_FILE execution count and time of each instruction and time of each function (CALL label) are written\n\t\t" \
+    "into the file, call stacks for flame graph tools into PROFILE_FILE.folded\n\t" \
+    "--sample=SAMPLE_FILE current instruction and call stack are sampled periodically (CPU time timer), instructions\n\t\t" \
+    "and call tree of functions by number of samples are written into the file, call stacks into SAMPLE_FILE.folded\n\t" \
+    "--sample-interval=MS milliseconds of CPU time between samples (default 1)\n\t" \
+    "--batch=INPUTS the program is loaded once and executed for each input file (INPUTS is a directory or a file\n\t\t" \
+    "listing input files), output, return code and stats of each run are written into DIR/NAME.out, DIR/NAME.rc, ...\n\t" \
+    "--batch-output=DIR directory of outputs of batch runs (default current directory)\n\t" \
+    "--jobs=N batch runs are executed by N worker processes (0 is one per CPU core, default 1)\n\t" \
     "--stats=STATS_FILE indicates stats file\n\t\t--insts stats option, counts \"executable\" instructions\n\t\t--hot stats option, finds the most used instruction\n\t\t" \
-    "--vars stats option, counts maximum number of initialized variables at a time"
\ No newline at end of file
+    "--vars stats option, counts maximum number of initialized variables at a time\n\t" \
+    "--stats-json=JSON_FILE all statistics, histogram of executed opcodes and execution counts of instructions (by order) in JSON"
\ No newline at end of file
@@ -1,4 +1,11 @@
 from sets import instructionSet
+
+# opcodes of shape [index] -> opcode and their indices of shape <opCode> -> index (of per-opcode counters)
+opCodes = tuple(instructionSet)
+opIndices = {opCode : index for index, opCode in enumerate(opCodes)}
+# instructions not counted by --insts
+notCounted = ('LABEL', 'DPRINT', 'BREAK')
+
 class Stats:
 
     _instance = None
@@ -16,15 +23,47 @@ class Stats:
         self.hot = 0                                        # --hot
         self.vars = 0                                       # --vars
         self.currentVars = 0                                # counter for current number of initialized variables
+        self.countVars = False                              # whether initialized variables are counted (--vars or JSON)
         self.statsGroups = {}                               # dictionary of shape <filename> => [statsopt1, statsopt2, ..., statsoptN]
+        self.jsonFile = None                                # file of JSON statistics (--stats-json)
+        self.collect = False                                # whether statistics are collected without being written (library API)
+
+        self.program = ()                                   # decoded instructions, in the order of execution counters
+        self.lines = {}                                     # dictionary of shape <order> -> index of execution counter
+        self.executions = []                                # list of shape [line of decoded program] -> number of executions
+
+    def requested(self):
+        '''
+        Returns whether statistics are collected
+        '''
+        return bool(self.statsGroups) or self.jsonFile is not None or self.collect
 
-        self.hotInstructions = {}                           # dictionary of shape <instructionOpCode => [useCount, firstAppear]
-        for instr in instructionSet:
-            self.hotInstructions[instr] = [0, 1]
+    def reset(self):
+        '''
+        Clears statistics of previous execution (batch mode), options stay
+        '''
+        self.insts = self.hot = self.vars = self.currentVars = 0
+        self.executions = [0] * len(self.program)
 
-    def updateInsts(self, instruction):
-        if instruction.opCode not in ('LABEL', 'DPRINT', 'BREAK'):
-            self.insts += 1
+    def bind(self, program):
+        '''
+        Prepares execution counters of decoded instructions of given program
+        '''
+        self.program = tuple(program)
+        self.lines = {instruction.order : line for line, instruction in enumerate(self.program)}
+        self.executions = [0] * len(self.program)
+
+    def lineOf(self, instruction):
+        '''
+        Returns index of execution counter of given decoded instruction (or its copy)
+        '''
+        return self.lines[instruction.order]
+
+    def count(self, instruction, count=1):
+        '''
+        Adds count executions of given decoded instruction
+        '''
+        self.executions[self.lines[instruction.order]] += count
 
     def updateVars(self, num):
         '''
@@ -34,26 +73,27 @@ class Stats:
         if self.currentVars > self.vars:
             self.vars = self.currentVars
 
-    def updateHot(self, instruction):
+    def histogram(self):
         '''
-        Updates "hot" stats for given instruction
+        Returns list of shape [opcode index] -> number of executions
         '''
-        self.hotInstructions[instruction.opCode][0] += 1
-        if self.hotInstructions[instruction.opCode][1] > instruction.order:
-            self.hotInstructions[instruction.opCode][1] = instruction.order
+        counts = [0] * len(opCodes)
+        for instruction, executions in zip(self.program, self.executions):
+            counts[opIndices[instruction.opCode]] += executions
+        return counts
 
-    def __findTheHottest(self):
+    def update(self):
         '''
-        Finds the most used instruction, if there are many with the same number of use, finds the one that appeared earlier in the code.
-        Returns order.
+        Computes --insts and --hot from execution counters
         '''
-        return list(sorted(list(self.hotInstructions.items()), key=lambda x: (x[1][0], 1/x[1][1]), reverse=True))[0][1][0] # too lon' :(
+        self.insts = sum(executions for instruction, executions in zip(self.program, self.executions)
+            if instruction.opCode not in notCounted)
+        self.hot = max(self.histogram(), default=0)
 
     def writeStats(self):
-        if not self.statsGroups: # if there is no file given -- don't print stats
+        if not self.statsGroups and self.jsonFile is None: # if there is no file given -- don't print stats
             return
-        self.hot = self.__findTheHottest()
-        print(self.statsGroups)
+        self.update()
         for fileName in self.statsGroups:
             file = open(fileName, 'w')
             statsText = ''
@@ -61,6 +101,21 @@ class Stats:
                 statsText += f'{getattr(self, stat)}\n'
             file.write(statsText)
             file.close()
+        if self.jsonFile is not None:
+            self.__writeJSON()
 
-    
-
+    def __writeJSON(self):
+        '''
+        Writes all statistics, histogram of executed opcodes and execution counts of instructions by order
+        '''
+        stats = {
+            'insts' : self.insts,
+            'hot' : self.hot,
+            'vars' : self.vars,
+            'opcodes' : {opCode : count for opCode, count in zip(opCodes, self.histogram()) if count},
+            'orders' : [{'order' : instruction.order, 'opcode' : instruction.opCode, 'count' : executions}
+                for instruction, executions in zip(self.program, self.executions)]}
+        import json
+        with open(self.jsonFile, 'w') as file:
+            json.dump(stats, file, indent=2)
+            file.write('\n')
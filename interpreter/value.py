@@ -0,0 +1,16 @@
+from sets import typeNames
+
+
+class Value:
+    '''
+    Runtime value cell of a variable or of a data stack item, type is a data type tag
+    (TYPE_VAR if variable is not initialized yet)
+    '''
+    __slots__ = ('type', 'value')
+
+    def __init__(self, type, value):
+        self.type = type
+        self.value = value
+
+    def __str__(self):
+        return f'{typeNames[self.type]}@{self.value}'